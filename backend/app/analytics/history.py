@@ -1,10 +1,36 @@
 """Analytics history tracking for astro field."""
 from __future__ import annotations
 
+import heapq
+import math
 import time
-from collections import deque
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
-from typing import Deque, List, Dict, Any
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterator, List
+
+# get_trends thresholds: minimum quartile delta and pleasure cut-offs
+TREND_THRESHOLD = 0.1
+POSITIVE_PLEASURE = 0.65
+NEGATIVE_PLEASURE = 0.35
+
+# Tones are interned to small ints so counting never hashes strings.
+# Unknown tones get the next free id on first sight.
+_TONE_NAMES: List[str] = ["warm", "cool", "neutral"]
+_TONE_IDS: Dict[str, int] = {tone: index for index, tone in enumerate(_TONE_NAMES)}
+
+
+def _finite(value: float) -> float:
+    """Count NaN/inf as 0.0 so one bad value cannot poison the running totals."""
+    return value if math.isfinite(value) else 0.0
+
+
+def _tone_id(tone: str) -> int:
+    tone_id = _TONE_IDS.get(tone)
+    if tone_id is None:
+        tone_id = _TONE_IDS[tone] = len(_TONE_NAMES)
+        _TONE_NAMES.append(tone)
+    return tone_id
 
 
 @dataclass
@@ -19,6 +45,270 @@ class FieldSnapshot:
     tone: str  # "warm", "cool", "neutral"
 
 
+class _SnapshotRing:
+    """Fixed-capacity ring buffer of snapshots with running totals.
+
+    Storage is preallocated once: the snapshot objects and their numeric
+    fields (timestamps, entropy, coherence, one column per PAD axis and the
+    tone) live in parallel lists of ``capacity`` slots.  Appending overwrites
+    the oldest slot once the ring is full and evicting from the left only moves
+    the head index, so neither path shifts memory or allocates.
+
+    Running totals are updated on every append and eviction, so whole-window
+    statistics never walk the snapshots.  Columns are addressed through
+    logical indices (0 is the oldest snapshot); ``slice`` copies only the
+    requested range, stitching the two physical segments when it wraps.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self._capacity = capacity
+        self._head = 0
+        self._count = 0
+        self._items: List[FieldSnapshot | None] = [None] * capacity
+        self.timestamps: List[float] = [0.0] * capacity
+        self.entropies: List[float] = [0.0] * capacity
+        self.coherences: List[float] = [0.0] * capacity
+        self.pads: tuple[List[float], List[float], List[float]] = (
+            [0.0] * capacity,
+            [0.0] * capacity,
+            [0.0] * capacity,
+        )
+        self.tones: List[int] = [0] * capacity
+        self.entropy_sum = 0.0
+        self.coherence_sum = 0.0
+        self.pad_sum = [0.0, 0.0, 0.0]
+        self.tone_counts: List[int] = [0] * len(_TONE_NAMES)  # indexed by tone id
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[FieldSnapshot]:
+        return map(self.at, self.slots())
+
+    def at(self, slot: int) -> FieldSnapshot:
+        """Return the snapshot stored in physical ``slot`` (see ``slots``)."""
+        return self._items[slot]  # type: ignore[return-value]
+
+    def slots(self) -> Iterator[int]:
+        """Iterate physical slot indices from the oldest snapshot to the newest.
+
+        Columns can be read through these indices in place, without copying
+        the window into a new list first.
+        """
+        end = self._head + self._count
+        if end <= self._capacity:
+            return iter(range(self._head, end))
+        return chain(range(self._head, self._capacity), range(end - self._capacity))
+
+    def __getitem__(self, index: int) -> FieldSnapshot:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        return self._items[(self._head + index) % self._capacity]  # type: ignore[return-value]
+
+    def append(self, snapshot: FieldSnapshot) -> None:
+        capacity = self._capacity
+        if not capacity:
+            return
+        if self._count == capacity:
+            self._forget(self._head)
+            slot = self._head
+            self._head = (slot + 1) % capacity
+        else:
+            slot = (self._head + self._count) % capacity
+            self._count += 1
+        self._remember(slot, snapshot)
+
+    def popleft(self) -> FieldSnapshot:
+        if not self._count:
+            raise IndexError("pop from an empty snapshot ring")
+        snapshot = self[0]
+        self.drop_oldest(1)
+        return snapshot
+
+    def drop_oldest(self, count: int) -> None:
+        """Evict the ``count`` oldest snapshots by advancing the head.
+
+        Small evictions subtract each snapshot from the running totals.  When
+        most of the window goes (typically the hourly age cleanup after a
+        quiet period) the evicted slots are released with slice assignments
+        and the totals are rebuilt from the survivors instead.
+        """
+        count = min(count, self._count)
+        if not count:
+            return
+        if count == self._count:
+            self.clear()
+            return
+
+        head = self._head
+        capacity = self._capacity
+        bulk = count * 2 > self._count
+        if not bulk:
+            for offset in range(count):
+                self._forget((head + offset) % capacity)
+        else:
+            items = self._items
+            end = head + count
+            if end <= capacity:
+                items[head:end] = [None] * count
+            else:
+                items[head:] = [None] * (capacity - head)
+                items[: end - capacity] = [None] * (end - capacity)
+
+        self._head = (head + count) % capacity
+        self._count -= count
+        if bulk:
+            self._recount()
+
+    def clear(self) -> None:
+        capacity = self._capacity
+        self._head = 0
+        self._count = 0
+        self._items = [None] * capacity
+        self.entropy_sum = 0.0
+        self.coherence_sum = 0.0
+        self.pad_sum = [0.0, 0.0, 0.0]
+        self.tone_counts = [0] * len(_TONE_NAMES)
+
+    def slice(self, column: List[Any], start: int, stop: int | None = None) -> List[Any]:
+        """Return ``column`` values for logical positions ``start:stop``."""
+        if stop is None or stop > self._count:
+            stop = self._count
+        if start >= stop:
+            return []
+        first = self._head + start
+        last = self._head + stop
+        capacity = self._capacity
+        if last <= capacity:
+            return column[first:last]
+        if first >= capacity:
+            return column[first - capacity : last - capacity]
+        return column[first:] + column[: last - capacity]
+
+    def total(self, column: List[Any], start: int, stop: int | None = None) -> float:
+        """Sum ``column`` over logical positions ``start:stop`` without stitching."""
+        if stop is None or stop > self._count:
+            stop = self._count
+        if start >= stop:
+            return 0.0
+        first = self._head + start
+        last = self._head + stop
+        capacity = self._capacity
+        if last <= capacity:
+            return sum(column[first:last])
+        if first >= capacity:
+            return sum(column[first - capacity : last - capacity])
+        return sum(column[first:], sum(column[: last - capacity]))
+
+    def snapshots(self, start: int, stop: int | None = None) -> List[FieldSnapshot]:
+        """Return the snapshot objects for logical positions ``start:stop``."""
+        return self.slice(self._items, start, stop)  # type: ignore[return-value]
+
+    def index_since(self, cutoff: float) -> int:
+        """Return the logical position of the first snapshot at or after ``cutoff``."""
+        return self._bisect(bisect_left, cutoff)
+
+    def index_after(self, moment: float) -> int:
+        """Return the logical position of the first snapshot strictly after ``moment``."""
+        return self._bisect(bisect_right, moment)
+
+    def _bisect(self, search: Callable[..., int], value: float) -> int:
+        # Timestamps are non-decreasing in logical order, so each physical
+        # segment of the ring is sorted and can be searched in place.
+        head = self._head
+        end = head + self._count
+        timestamps = self.timestamps
+        if end <= self._capacity:
+            return search(timestamps, value, head, end) - head
+        capacity = self._capacity
+        if search(timestamps, value, capacity - 1, capacity) == capacity - 1:
+            return search(timestamps, value, head, capacity) - head
+        return (capacity - head) + search(timestamps, value, 0, end - capacity)
+
+    def _remember(self, slot: int, snapshot: FieldSnapshot) -> None:
+        # Columns hold the values that went into the totals, so _forget
+        # subtracts exactly what was added.
+        pad = [_finite(value) for value in snapshot.pad[:3]]
+        entropy = _finite(snapshot.entropy)
+        coherence = _finite(snapshot.coherence)
+        self._items[slot] = snapshot
+        self.timestamps[slot] = snapshot.timestamp
+        self.entropies[slot] = entropy
+        self.coherences[slot] = coherence
+        tone_id = _tone_id(snapshot.tone)
+        self.tones[slot] = tone_id
+        for column, value in zip(self.pads, pad):
+            column[slot] = value
+
+        self.entropy_sum += entropy
+        self.coherence_sum += coherence
+        pad_sum = self.pad_sum
+        pad_sum[0] += pad[0]
+        pad_sum[1] += pad[1]
+        pad_sum[2] += pad[2]
+        tone_counts = self.tone_counts
+        if tone_id >= len(tone_counts):
+            tone_counts.extend([0] * (tone_id + 1 - len(tone_counts)))
+        tone_counts[tone_id] += 1
+
+    def _recount(self) -> None:
+        """Rebuild the running totals from the live window."""
+        self.entropy_sum = self.total(self.entropies, 0)
+        self.coherence_sum = self.total(self.coherences, 0)
+        self.pad_sum = [self.total(column, 0) for column in self.pads]
+        tones = self.slice(self.tones, 0)
+        self.tone_counts = [tones.count(tone_id) for tone_id in range(len(self.tone_counts))]
+
+    def _forget(self, slot: int) -> None:
+        snapshot = self._items[slot]
+        self._items[slot] = None
+        if snapshot is None:
+            return
+
+        self.entropy_sum -= self.entropies[slot]
+        self.coherence_sum -= self.coherences[slot]
+        pad_sum = self.pad_sum
+        pads = self.pads
+        pad_sum[0] -= pads[0][slot]
+        pad_sum[1] -= pads[1][slot]
+        pad_sum[2] -= pads[2][slot]
+        self.tone_counts[self.tones[slot]] -= 1
+
+    def tone_distribution(self, start: int = 0) -> Dict[str, float]:
+        """Share of each tone over logical positions ``start:``."""
+        count = self._count - start
+        if count <= 0:
+            return {}
+        if start == 0:
+            counts = self.tone_counts
+        else:
+            tones = self.slice(self.tones, start)
+            counts = [
+                tones.count(tone_id) if total else 0
+                for tone_id, total in enumerate(self.tone_counts)
+            ]
+        # Keys follow first appearance in the window, as when counting while
+        # walking the snapshots; stop once every tone present has been seen.
+        present = sum(1 for n in counts if n)
+        order: List[int] = []
+        tones = self.tones
+        for slot in islice(self.slots(), start, None):
+            tone_id = tones[slot]
+            if tone_id not in order:
+                order.append(tone_id)
+                if len(order) == present:
+                    break
+        return {_TONE_NAMES[tone_id]: counts[tone_id] / count for tone_id in order}
+
+
+def _trend_direction(diff: float) -> str:
+    if abs(diff) < TREND_THRESHOLD:
+        return "stable"
+    return "increasing" if diff > 0 else "decreasing"
+
+
 class AnalyticsHistory:
     """Track astro field history for analytics."""
 
@@ -29,7 +319,7 @@ class AnalyticsHistory:
             max_snapshots: Maximum number of snapshots to keep
             max_age_seconds: Maximum age of snapshots in seconds (default: 24 hours)
         """
-        self._snapshots: Deque[FieldSnapshot] = deque(maxlen=max_snapshots)
+        self._snapshots = _SnapshotRing(max_snapshots)
         self._max_age_seconds = max_age_seconds
         self._last_cleanup = time.time()
 
@@ -72,9 +362,7 @@ class AnalyticsHistory:
         now = time.time()
         cutoff = now - self._max_age_seconds
 
-        # Remove from left while timestamps are too old
-        while self._snapshots and self._snapshots[0].timestamp < cutoff:
-            self._snapshots.popleft()
+        self._snapshots.drop_oldest(self._snapshots.index_since(cutoff))
 
     def get_recent_snapshots(self, count: int = 100) -> List[FieldSnapshot]:
         """Get most recent snapshots.
@@ -85,7 +373,9 @@ class AnalyticsHistory:
         Returns:
             List of recent snapshots
         """
-        return list(self._snapshots)[-count:]
+        window = self._snapshots
+        start = len(window) - count if 0 < count < len(window) else 0
+        return window.snapshots(start)
 
     def get_time_range(self, start_time: float, end_time: float) -> List[FieldSnapshot]:
         """Get snapshots within time range.
@@ -97,7 +387,8 @@ class AnalyticsHistory:
         Returns:
             List of snapshots in range
         """
-        return [s for s in self._snapshots if start_time <= s.timestamp <= end_time]
+        window = self._snapshots
+        return window.snapshots(window.index_since(start_time), window.index_after(end_time))
 
     def get_statistics(self, window_seconds: int | None = None) -> Dict[str, Any]:
         """Calculate statistics over time window.
@@ -108,48 +399,50 @@ class AnalyticsHistory:
         Returns:
             Statistics dict
         """
-        if window_seconds:
-            cutoff = time.time() - window_seconds
-            snapshots = [s for s in self._snapshots if s.timestamp >= cutoff]
-        else:
-            snapshots = list(self._snapshots)
-
-        if not snapshots:
-            return {
-                "count": 0,
-                "avg_entropy": 0.0,
-                "avg_coherence": 0.0,
-                "avg_pad": [0.5, 0.35, 0.45],
-                "tone_distribution": {},
-                "time_span_seconds": 0.0,
-            }
+        if not window_seconds:
+            return self._window_statistics()
 
-        # Calculate averages
-        avg_entropy = sum(s.entropy for s in snapshots) / len(snapshots)
-        avg_coherence = sum(s.coherence for s in snapshots) / len(snapshots)
+        window = self._snapshots
+        start = window.index_since(time.time() - window_seconds)
+        count = len(window) - start
+        if count <= 0:
+            return self._empty_statistics()
 
-        avg_pad = [
-            sum(s.pad[0] for s in snapshots) / len(snapshots),
-            sum(s.pad[1] for s in snapshots) / len(snapshots),
-            sum(s.pad[2] for s in snapshots) / len(snapshots),
-        ]
+        return {
+            "count": count,
+            "avg_entropy": round(window.total(window.entropies, start) / count, 3),
+            "avg_coherence": round(window.total(window.coherences, start) / count, 3),
+            "avg_pad": [round(window.total(column, start) / count, 3) for column in window.pads],
+            "tone_distribution": window.tone_distribution(start),
+            "time_span_seconds": window[-1].timestamp - window[start].timestamp if count > 1 else 0,
+        }
 
-        # Tone distribution
-        tone_counts: Dict[str, int] = {}
-        for snapshot in snapshots:
-            tone_counts[snapshot.tone] = tone_counts.get(snapshot.tone, 0) + 1
+    def _window_statistics(self) -> Dict[str, Any]:
+        """Statistics over the whole window, read from the running totals."""
+        window = self._snapshots
+        count = len(window)
+        if not count:
+            return self._empty_statistics()
 
-        tone_distribution = {
-            tone: count / len(snapshots) for tone, count in tone_counts.items()
+        pad_sum = window.pad_sum
+        return {
+            "count": count,
+            "avg_entropy": round(window.entropy_sum / count, 3),
+            "avg_coherence": round(window.coherence_sum / count, 3),
+            "avg_pad": [round(p / count, 3) for p in pad_sum],
+            "tone_distribution": window.tone_distribution(),
+            "time_span_seconds": window[-1].timestamp - window[0].timestamp if count > 1 else 0,
         }
 
+    @staticmethod
+    def _empty_statistics() -> Dict[str, Any]:
         return {
-            "count": len(snapshots),
-            "avg_entropy": round(avg_entropy, 3),
-            "avg_coherence": round(avg_coherence, 3),
-            "avg_pad": [round(p, 3) for p in avg_pad],
-            "tone_distribution": tone_distribution,
-            "time_span_seconds": snapshots[-1].timestamp - snapshots[0].timestamp if len(snapshots) > 1 else 0,
+            "count": 0,
+            "avg_entropy": 0.0,
+            "avg_coherence": 0.0,
+            "avg_pad": [0.5, 0.35, 0.45],
+            "tone_distribution": {},
+            "time_span_seconds": 0.0,
         }
 
     def get_trends(self, window_seconds: int = 3600) -> Dict[str, Any]:
@@ -161,10 +454,11 @@ class AnalyticsHistory:
         Returns:
             Trend analysis dict
         """
-        cutoff = time.time() - window_seconds
-        snapshots = [s for s in self._snapshots if s.timestamp >= cutoff]
+        window = self._snapshots
+        start = window.index_since(time.time() - window_seconds)
+        count = len(window) - start
 
-        if len(snapshots) < 2:
+        if count < 2:
             return {
                 "entropy_trend": "stable",
                 "coherence_trend": "stable",
@@ -172,46 +466,32 @@ class AnalyticsHistory:
             }
 
         # Calculate trends using first and last quartile
-        q1_size = max(1, len(snapshots) // 4)
-        first_quarter = snapshots[:q1_size]
-        last_quarter = snapshots[-q1_size:]
+        q1_size = max(1, count // 4)
+        first_stop = start + q1_size
+        last_start = len(window) - q1_size
 
-        avg_entropy_first = sum(s.entropy for s in first_quarter) / len(first_quarter)
-        avg_entropy_last = sum(s.entropy for s in last_quarter) / len(last_quarter)
+        avg_entropy_first = window.total(window.entropies, start, first_stop) / q1_size
+        avg_entropy_last = window.total(window.entropies, last_start) / q1_size
 
-        avg_coherence_first = sum(s.coherence for s in first_quarter) / len(first_quarter)
-        avg_coherence_last = sum(s.coherence for s in last_quarter) / len(last_quarter)
+        avg_coherence_first = window.total(window.coherences, start, first_stop) / q1_size
+        avg_coherence_last = window.total(window.coherences, last_start) / q1_size
 
         # Determine trends
         entropy_diff = avg_entropy_last - avg_entropy_first
         coherence_diff = avg_coherence_last - avg_coherence_first
 
-        if abs(entropy_diff) < 0.1:
-            entropy_trend = "stable"
-        elif entropy_diff > 0:
-            entropy_trend = "increasing"
-        else:
-            entropy_trend = "decreasing"
-
-        if abs(coherence_diff) < 0.1:
-            coherence_trend = "stable"
-        elif coherence_diff > 0:
-            coherence_trend = "increasing"
-        else:
-            coherence_trend = "decreasing"
-
         # Overall mood from PAD
-        avg_pleasure = sum(s.pad[0] for s in last_quarter) / len(last_quarter)
-        if avg_pleasure >= 0.65:
+        avg_pleasure = window.total(window.pads[0], last_start) / q1_size
+        if avg_pleasure >= POSITIVE_PLEASURE:
             overall_mood = "positive"
-        elif avg_pleasure <= 0.35:
+        elif avg_pleasure <= NEGATIVE_PLEASURE:
             overall_mood = "negative"
         else:
             overall_mood = "neutral"
 
         return {
-            "entropy_trend": entropy_trend,
-            "coherence_trend": coherence_trend,
+            "entropy_trend": _trend_direction(entropy_diff),
+            "coherence_trend": _trend_direction(coherence_diff),
             "overall_mood": overall_mood,
             "entropy_change": round(entropy_diff, 3),
             "coherence_change": round(coherence_diff, 3),
@@ -234,18 +514,20 @@ class AnalyticsHistory:
                 "lowest_coherence": [],
             }
 
-        snapshots = list(self._snapshots)
+        window = self._snapshots
+        entropy = window.entropies.__getitem__
+        coherence = window.coherences.__getitem__
 
-        highest_entropy = sorted(snapshots, key=lambda s: s.entropy, reverse=True)[:count]
-        lowest_entropy = sorted(snapshots, key=lambda s: s.entropy)[:count]
-        highest_coherence = sorted(snapshots, key=lambda s: s.coherence, reverse=True)[:count]
-        lowest_coherence = sorted(snapshots, key=lambda s: s.coherence)[:count]
+        def pick(select: Callable[..., List[int]], key: Callable[[int], float]) -> List[FieldSnapshot]:
+            # Rank physical slots in logical order straight off the columns;
+            # heapq.nlargest/nsmallest equal sorted(...)[:count], ties included.
+            return [window.at(slot) for slot in select(count, window.slots(), key=key)]
 
         return {
-            "highest_entropy": highest_entropy,
-            "lowest_entropy": lowest_entropy,
-            "highest_coherence": highest_coherence,
-            "lowest_coherence": lowest_coherence,
+            "highest_entropy": pick(heapq.nlargest, entropy),
+            "lowest_entropy": pick(heapq.nsmallest, entropy),
+            "highest_coherence": pick(heapq.nlargest, coherence),
+            "lowest_coherence": pick(heapq.nsmallest, coherence),
         }
 
 
@@ -0,0 +1,65 @@
+"""Emotion label catalog shared by the AstroLayer and the emotions API."""
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+PAD_LABELS: Dict[str, List[float]] = {
+    # Положительные эмоции (высокий Pleasure)
+    "свет": [0.68, 0.42, 0.35],
+    "радость": [0.85, 0.55, 0.6],
+    "восторг": [0.92, 0.75, 0.65],
+    "спокойствие": [0.6, 0.2, 0.7],
+    "вдохновение": [0.78, 0.6, 0.58],
+    "любовь": [0.82, 0.48, 0.5],
+    "интерес": [0.7, 0.5, 0.55],
+    "надежда": [0.75, 0.45, 0.52],
+    "благодарность": [0.80, 0.35, 0.65],
+    "умиротворение": [0.72, 0.15, 0.75],
+    "нежность": [0.77, 0.30, 0.45],
+    "восхищение": [0.82, 0.62, 0.58],
+    "предвкушение": [0.73, 0.68, 0.55],
+    "облегчение": [0.65, 0.28, 0.50],
+    "удовлетворение": [0.71, 0.25, 0.68],
+    "любопытство": [0.68, 0.52, 0.48],
+    "азарт": [0.80, 0.78, 0.72],
+    "гармония": [0.75, 0.20, 0.70],
+
+    # Отрицательные эмоции (низкий Pleasure)
+    "грусть": [0.2, 0.35, 0.25],
+    "злость": [0.1, 0.65, 0.7],
+    "тревога": [0.25, 0.72, 0.3],
+    "страх": [0.15, 0.80, 0.22],
+    "печаль": [0.18, 0.40, 0.28],
+    "разочарование": [0.22, 0.45, 0.35],
+    "отчаяние": [0.08, 0.52, 0.18],
+    "вина": [0.20, 0.48, 0.30],
+    "стыд": [0.12, 0.58, 0.20],
+    "зависть": [0.25, 0.55, 0.45],
+    "обида": [0.18, 0.50, 0.32],
+    "ярость": [0.05, 0.85, 0.80],
+    "беспокойство": [0.30, 0.60, 0.35],
+    "тоска": [0.15, 0.30, 0.25],
+    "одиночество": [0.12, 0.38, 0.22],
+    "растерянность": [0.28, 0.55, 0.25],
+    "скука": [0.35, 0.15, 0.40],
+
+    # Нейтральные/смешанные эмоции
+    "удивление": [0.50, 0.70, 0.50],
+    "замешательство": [0.35, 0.58, 0.30],
+    "ностальгия": [0.45, 0.38, 0.42],
+    "меланхолия": [0.32, 0.30, 0.35],
+    "задумчивость": [0.48, 0.25, 0.55],
+    "созерцание": [0.55, 0.18, 0.60],
+    "покой": [0.65, 0.12, 0.72],
+    "безмятежность": [0.70, 0.10, 0.75],
+}
+
+DEFAULT_PAD = [0.5, 0.35, 0.45]
+
+# Immutable lookup table built once at import: label -> (P, A, D) tuple.
+# Tuples of floats are shared between calls and copied into a fresh list on
+# lookup, so callers can still mutate the vector they receive.
+PAD_TABLE: Dict[str, Tuple[float, float, float]] = {
+    label: (float(pad[0]), float(pad[1]), float(pad[2])) for label, pad in PAD_LABELS.items()
+}
+DEFAULT_PAD_TUPLE: Tuple[float, float, float] = (DEFAULT_PAD[0], DEFAULT_PAD[1], DEFAULT_PAD[2])
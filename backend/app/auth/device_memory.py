@@ -3,12 +3,55 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import math
 import time
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
 
 logger = logging.getLogger(__name__)
 
+SEED_ALPHA = 0.15  # Same as liminal-voice-core
+
+
+@lru_cache(maxsize=4096)
+def _fingerprint_digest(user_agent: str, ip: str, user_id: str) -> str:
+    fingerprint = f"{user_agent}:{ip}:{user_id}"
+    return hashlib.blake2b(fingerprint.encode(), digest_size=8).hexdigest()
+
+
+def _blend_seed(old: List[float], new: List[float], alpha: float = SEED_ALPHA) -> List[float]:
+    """EMA step of a PAD seed towards ``new``."""
+    keep = 1 - alpha
+    if len(old) == 3 and len(new) == 3:
+        return [
+            old[0] * keep + new[0] * alpha,
+            old[1] * keep + new[1] * alpha,
+            old[2] * keep + new[2] * alpha,
+        ]
+    return [o * keep + n * alpha for o, n in zip(old, new)]
+
+
+def _seed_norm(seed: List[float]) -> float:
+    if len(seed) == 3:
+        p, a, d = seed
+        return math.sqrt(p * p + a * a + d * d)
+    return math.sqrt(sum(v * v for v in seed))
+
+
+def _resonance(seed1: List[float], norm1: float, seed2: List[float], norm2: float) -> float:
+    """Cosine similarity of two PAD seeds mapped to 0-1."""
+    if norm1 == 0 or norm2 == 0:
+        return 0.0
+
+    if len(seed1) == 3 and len(seed2) == 3:
+        dot_product = seed1[0] * seed2[0] + seed1[1] * seed2[1] + seed1[2] * seed2[2]
+    else:
+        dot_product = sum(a * b for a, b in zip(seed1, seed2))
+
+    # Normalize to 0-1 range (cosine is -1 to 1)
+    return (dot_product / (norm1 * norm2) + 1) / 2
+
 
 @dataclass
 class DeviceProfile:
@@ -22,6 +65,14 @@ class DeviceProfile:
     emotional_seed: List[float]  # PAD vector
     trust_level: float  # 0.0-1.0
     tags: List[str]
+    seed_norm: float = field(init=False, repr=False)  # cached L2 norm of emotional_seed
+
+    def __post_init__(self) -> None:
+        self.seed_norm = _seed_norm(self.emotional_seed)
+
+    def set_emotional_seed(self, seed: List[float]) -> None:
+        self.emotional_seed = seed
+        self.seed_norm = _seed_norm(seed)
 
     def to_dict(self) -> Dict:
         return {
@@ -42,6 +93,9 @@ class DeviceMemoryStore:
     def __init__(self):
         self._devices: Dict[str, DeviceProfile] = {}
         self._user_devices: Dict[str, List[str]] = {}  # user_id -> [device_ids]
+        # Running aggregates for get_stats()
+        self._total_interactions = 0
+        self._trust_sum = 0.0
 
     def generate_device_id(self, user_agent: str, ip: str, user_id: str) -> str:
         """Generate stable device ID from fingerprint.
@@ -52,11 +106,9 @@ class DeviceMemoryStore:
             user_id: User identifier
 
         Returns:
-            Device ID (SHA256 hash)
+            Device ID (16 hex chars of a BLAKE2b digest)
         """
-        fingerprint = f"{user_agent}:{ip}:{user_id}"
-        device_id = hashlib.sha256(fingerprint.encode()).hexdigest()[:16]
-        return device_id
+        return _fingerprint_digest(user_agent, ip, user_id)
 
     def register_device(
         self,
@@ -86,14 +138,13 @@ class DeviceMemoryStore:
 
             # Update emotional seed with EMA
             if emotional_seed:
-                alpha = 0.15  # Same as liminal-voice-core
-                profile.emotional_seed = [
-                    old * (1 - alpha) + new * alpha
-                    for old, new in zip(profile.emotional_seed, emotional_seed)
-                ]
+                profile.set_emotional_seed(_blend_seed(profile.emotional_seed, emotional_seed))
 
             # Increase trust with more interactions
-            profile.trust_level = min(1.0, profile.trust_level + 0.05)
+            trust_level = min(1.0, profile.trust_level + 0.05)
+            self._trust_sum += trust_level - profile.trust_level
+            profile.trust_level = trust_level
+            self._total_interactions += 1
 
             logger.info("Updated device %s for user %s (interactions: %d)", device_id, user_id, profile.interaction_count)
         else:
@@ -110,6 +161,8 @@ class DeviceMemoryStore:
             )
 
             self._devices[device_id] = profile
+            self._total_interactions += 1
+            self._trust_sum += profile.trust_level
 
             # Track user's devices
             if user_id not in self._user_devices:
@@ -152,12 +205,7 @@ class DeviceMemoryStore:
         """
         if device_id in self._devices:
             profile = self._devices[device_id]
-            alpha = 0.15
-
-            profile.emotional_seed = [
-                old * (1 - alpha) + new * alpha
-                for old, new in zip(profile.emotional_seed, pad)
-            ]
+            profile.set_emotional_seed(_blend_seed(profile.emotional_seed, pad))
 
             logger.debug("Updated emotional seed for device %s: %s", device_id, profile.emotional_seed)
 
@@ -177,23 +225,36 @@ class DeviceMemoryStore:
         if not profile1 or not profile2:
             return 0.0
 
-        # Calculate cosine similarity between emotional seeds
-        seed1 = profile1.emotional_seed
-        seed2 = profile2.emotional_seed
-
-        dot_product = sum(a * b for a, b in zip(seed1, seed2))
-        magnitude1 = sum(a * a for a in seed1) ** 0.5
-        magnitude2 = sum(b * b for b in seed2) ** 0.5
+        return _resonance(
+            profile1.emotional_seed, profile1.seed_norm, profile2.emotional_seed, profile2.seed_norm
+        )
 
-        if magnitude1 == 0 or magnitude2 == 0:
-            return 0.0
+    def calculate_resonance_many(self, device_id: str, other_ids: Iterable[str]) -> Dict[str, float]:
+        """Calculate resonance between one device and several others.
 
-        similarity = dot_product / (magnitude1 * magnitude2)
+        The source profile is resolved once for the batch.
 
-        # Normalize to 0-1 range (cosine is -1 to 1)
-        resonance = (similarity + 1) / 2
+        Args:
+            device_id: Source device ID
+            other_ids: Device IDs to compare against
 
-        return resonance
+        Returns:
+            Mapping of device ID to resonance score (0.0-1.0)
+        """
+        profile = self._devices.get(device_id)
+        if not profile:
+            return {other_id: 0.0 for other_id in other_ids}
+
+        seed = profile.emotional_seed
+        norm = profile.seed_norm
+        devices = self._devices
+        result: Dict[str, float] = {}
+        for other_id in other_ids:
+            other = devices.get(other_id)
+            result[other_id] = (
+                _resonance(seed, norm, other.emotional_seed, other.seed_norm) if other else 0.0
+            )
+        return result
 
     def get_stats(self) -> Dict:
         """Get device memory statistics.
@@ -201,17 +262,12 @@ class DeviceMemoryStore:
         Returns:
             Statistics dict
         """
-        total_interactions = sum(p.interaction_count for p in self._devices.values())
-        avg_trust = (
-            sum(p.trust_level for p in self._devices.values()) / len(self._devices)
-            if self._devices
-            else 0.0
-        )
+        avg_trust = self._trust_sum / len(self._devices) if self._devices else 0.0
 
         return {
             "total_devices": len(self._devices),
             "total_users": len(self._user_devices),
-            "total_interactions": total_interactions,
+            "total_interactions": self._total_interactions,
             "avg_trust_level": round(avg_trust, 3),
         }
 
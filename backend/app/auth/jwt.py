@@ -1,8 +1,13 @@
 """JWT authentication for liminal-you."""
 from __future__ import annotations
 
+import base64
+import binascii
+import hashlib
+import hmac
+import json
 import time
-from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Any
 
 import jwt
@@ -13,6 +18,74 @@ from ..config import settings
 
 security = HTTPBearer()
 
+# Verified payloads keyed by raw token; entries live for at most
+# _DECODE_CACHE_TTL seconds and never past the token's own expiry.
+_DECODE_CACHE_TTL = 60.0
+_DECODE_CACHE_SIZE = 4096
+_decode_cache: Dict[str, tuple[float, Dict[str, Any]]] = {}
+
+# Access token lifetime; settings are fixed at import, so compute it once.
+_EXP_SECONDS = settings.jwt_expiration_hours * 3600
+
+
+def _cache_payload(token: str, payload: Dict[str, Any], now: float) -> None:
+    if len(_decode_cache) >= _DECODE_CACHE_SIZE:
+        # Dicts keep insertion order, so the first key is the oldest entry.
+        del _decode_cache[next(iter(_decode_cache))]
+    expires_at = now + _DECODE_CACHE_TTL
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)) and exp < expires_at:
+        expires_at = exp
+    _decode_cache[token] = (expires_at, payload)
+
+
+@lru_cache(maxsize=1)
+def _hmac_key(secret: str) -> bytes:
+    return secret.encode("utf-8")
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _verify_hs256(token: str, now: float) -> Dict[str, Any] | None:
+    """Verify a plain HS256 token without going through PyJWT.
+
+    Returns the payload only for tokens this module issues (a signed
+    ``exp``/``iat`` claim set with no ``nbf``/``aud``). Anything else,
+    including a bad signature or an expired token, returns ``None`` so
+    that ``jwt.decode`` produces the canonical result or error.
+    """
+    if settings.jwt_algorithm != "HS256":
+        return None
+    try:
+        signing_input, _, signature = token.rpartition(".")
+        header_segment, _, payload_segment = signing_input.partition(".")
+        if not header_segment or not payload_segment or "." in payload_segment:
+            return None
+        header = json.loads(_b64url_decode(header_segment))
+        if not isinstance(header, dict) or header.get("alg") != "HS256" or header.keys() - {"alg", "typ"}:
+            return None
+        expected = hmac.new(
+            _hmac_key(settings.jwt_secret), signing_input.encode("ascii"), hashlib.sha256
+        ).digest()
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            return None
+        payload = json.loads(_b64url_decode(payload_segment))
+    except (ValueError, UnicodeError, binascii.Error):
+        return None
+
+    if not isinstance(payload, dict) or "nbf" in payload or "aud" in payload:
+        return None
+    exp = payload.get("exp")
+    iat = payload.get("iat")
+    if type(exp) is not int or exp <= now:
+        return None
+    # PyJWT rejects tokens issued in the future (ImmatureSignatureError).
+    if iat is not None and (type(iat) is not int or iat > now):
+        return None
+    return payload
+
 
 def create_access_token(user_id: str, device_id: str | None = None, extra_claims: Dict[str, Any] | None = None) -> str:
     """Create JWT access token.
@@ -25,13 +98,12 @@ def create_access_token(user_id: str, device_id: str | None = None, extra_claims
     Returns:
         Encoded JWT token
     """
-    now = datetime.utcnow()
-    expires = now + timedelta(hours=settings.jwt_expiration_hours)
+    now = int(time.time())
 
     payload = {
         "sub": user_id,
-        "iat": int(now.timestamp()),
-        "exp": int(expires.timestamp()),
+        "iat": now,
+        "exp": now + _EXP_SECONDS,
         "type": "access",
     }
 
@@ -57,12 +129,21 @@ def decode_access_token(token: str) -> Dict[str, Any]:
     Raises:
         HTTPException: If token is invalid or expired
     """
+    now = time.time()
+    cached = _decode_cache.get(token)
+    if cached is not None:
+        if cached[0] > now:
+            return dict(cached[1])
+        _decode_cache.pop(token, None)
+
     try:
-        payload = jwt.decode(
-            token,
-            settings.jwt_secret,
-            algorithms=[settings.jwt_algorithm],
-        )
+        payload = _verify_hs256(token, now)
+        if payload is None:
+            payload = jwt.decode(
+                token,
+                settings.jwt_secret,
+                algorithms=[settings.jwt_algorithm],
+            )
 
         # Validate token type
         if payload.get("type") != "access":
@@ -71,7 +152,8 @@ def decode_access_token(token: str) -> Dict[str, Any]:
                 detail="Invalid token type",
             )
 
-        return payload
+        _cache_payload(token, payload, now)
+        return dict(payload)
 
     except jwt.ExpiredSignatureError:
         raise HTTPException(
@@ -7,10 +7,14 @@ __all__ = ["generate_hint"]
 
 
 def _extract_metric(payload: Mapping[str, object] | None, *keys: str) -> float:
+    if not payload:
+        return 0.0
     for key in keys:
-        if not payload or key not in payload:
+        value = payload.get(key)
+        if type(value) is float:
+            return value  # type: ignore[return-value]
+        if value is None:
             continue
-        value = payload[key]
         try:
             return float(value)  # type: ignore[arg-type]
         except (TypeError, ValueError):
@@ -2,12 +2,12 @@
 from __future__ import annotations
 
 import os
+from dataclasses import dataclass, field
 from typing import Literal
 
-from pydantic import BaseModel
 
-
-class Settings(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Settings:
     """Application settings."""
 
     # Database
@@ -20,6 +20,9 @@ class Settings(BaseModel):
     # LiminalDB
     liminaldb_enabled: bool = os.getenv("LIMINALDB_ENABLED", "true").lower() == "true"
     liminaldb_url: str = os.getenv("LIMINALDB_URL", "ws://127.0.0.1:8787")
+    liminaldb_pool_min_size: int = int(os.getenv("LIMINALDB_POOL_MIN_SIZE", "2"))
+    liminaldb_pool_max_size: int = int(os.getenv("LIMINALDB_POOL_MAX_SIZE", "8"))
+    liminaldb_request_timeout_s: float = float(os.getenv("LIMINALDB_REQUEST_TIMEOUT_S", "10"))
 
     # Storage backend
     storage_backend: Literal["memory", "postgres", "liminaldb"] = os.getenv(
@@ -34,8 +37,23 @@ class Settings(BaseModel):
     # Feedback
     feedback_enabled: bool = os.getenv("FEEDBACK_ENABLED", "true").lower() == "true"
 
+    # In-memory history caps
+    mirror_event_cap: int = int(os.getenv("MIRROR_EVENT_CAP", "50000"))
+    # A zero-length deque never fills, so the eviction in LiminalDBStorage.add_reflection breaks.
+    reflection_cache_cap: int = max(1, int(os.getenv("REFLECTION_CACHE_CAP", "10000")))
+
+    # Mirror event write batching
+    mirror_batch_size: int = int(os.getenv("MIRROR_BATCH_SIZE", "256"))
+    mirror_batch_ms: int = int(os.getenv("MIRROR_BATCH_MS", "50"))
+
+    # Retry delay after a failed mirror policy rebuild, doubled up to the max
+    mirror_rebuild_retry_s: float = float(os.getenv("MIRROR_REBUILD_RETRY_S", "60"))
+    mirror_rebuild_retry_max_s: float = float(os.getenv("MIRROR_REBUILD_RETRY_MAX_S", "3600"))
+
     # CORS
-    cors_origins: list[str] = ["http://localhost:5173", "http://localhost:3000"]
+    cors_origins: list[str] = field(
+        default_factory=lambda: ["http://localhost:5173", "http://localhost:3000"]
+    )
 
 
 settings = Settings()
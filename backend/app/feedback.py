@@ -4,12 +4,15 @@ import asyncio
 import logging
 import os
 import time
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Deque, Dict, Optional
 
+import orjson
 from fastapi import WebSocket
-from starlette.websockets import WebSocketDisconnect
+from starlette.websockets import WebSocketDisconnect, WebSocketState
 
 from .astro import AstroField
 from .causal import generate_hint
@@ -26,6 +29,18 @@ _FEEDBACK_MESSAGES = {
     "neutral": "Слушаем поле.",
 }
 
+# (tone, message) pairs selected by index in ``_baseline_analysis``.
+_TONE_TABLE = tuple(_FEEDBACK_MESSAGES.items())
+_WARM, _COOL, _NEUTRAL = range(3)
+_DEFAULT_PAD = (0.0, 0.0, 0.0)
+
+# Per-profile feedback opt-in is cached for a few seconds per broadcast fanout.
+_PREF_CACHE_TTL = 5.0
+_PREF_CACHE_SIZE = 1024
+
+# How often the hub sweeps out sockets that closed without a disconnect().
+_REAP_INTERVAL = 30.0
+
 
 def get_feedback_message(tone: str, language: Language = "ru") -> str:
     """Get feedback message in specified language.
@@ -41,14 +56,35 @@ def get_feedback_message(tone: str, language: Language = "ru") -> str:
     return translate(key, language)
 
 
+def _encode_frame(payload: Dict[str, Any]) -> str:
+    """Serialize a payload to the compact JSON text ``send_json`` would produce."""
+    return orjson.dumps(payload).decode()
+
+
+def _is_open(websocket: WebSocket) -> bool:
+    return (
+        websocket.client_state is WebSocketState.CONNECTED
+        and websocket.application_state is WebSocketState.CONNECTED
+    )
+
+
+@lru_cache(maxsize=1)
 def _is_feature_globally_enabled() -> bool:
+    """Read ``FEEDBACK_ENABLED`` once; call ``.cache_clear()`` to re-read it."""
     raw = os.getenv("FEEDBACK_ENABLED", "true").lower()
     return raw not in {"0", "false", "off"}
 
 
-@dataclass
+@dataclass(slots=True)
 class _ConnectionInfo:
     profile_id: Optional[str]
+    # Serializes writes to one socket while broadcasts to different sockets
+    # run concurrently.
+    send_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False, compare=False)
+
+    async def send(self, websocket: WebSocket, frame: str) -> None:
+        async with self.send_lock:
+            await websocket.send_text(frame)
 
     def is_feedback_enabled(self) -> bool:
         if not self.profile_id:
@@ -75,22 +111,27 @@ class NeuroFeedbackHub:
         self._astro_field = AstroField()
         self._lock = asyncio.Lock()
         self._last_payload: Dict[str, Any] | None = None
-        self._last_sent_ts = 0.0
-        self._interval = interval
+        self._last_frame: str | None = None
+        self._last_sent_ns = 0
+        self._interval_ns = int(interval * 1_000_000_000)
         self._change_threshold = change_threshold
         self._broadcast_task: asyncio.Task[None] | None = None
-        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self._reaper_task: asyncio.Task[None] | None = None
+        self._pending_states: Deque[Dict[str, Any]] = deque()
+        self._state_ready = asyncio.Event()
         self._last_state: Dict[str, Any] | None = None
         self._last_analysis: Dict[str, Any] | None = None
+        self._pref_cache: Dict[str, tuple[float, bool]] = {}
 
     async def connect(self, websocket: WebSocket, profile_id: str | None = None) -> None:
         await websocket.accept()
+        info = _ConnectionInfo(profile_id=profile_id)
         async with self._lock:
-            self._connections[websocket] = _ConnectionInfo(profile_id=profile_id)
-            self._ensure_broadcast_loop()
-        if self._last_payload and self._should_send_feedback(websocket):
+            self._connections[websocket] = info
+        self._ensure_broadcast_loop()
+        if self._last_frame and self._should_send_feedback(websocket):
             try:
-                await websocket.send_json(self._last_payload)
+                await info.send(websocket, self._last_frame)
             except WebSocketDisconnect:
                 await self.disconnect(websocket)
 
@@ -99,23 +140,33 @@ class NeuroFeedbackHub:
             self._connections.pop(websocket, None)
 
     async def publish(self, message: Dict[str, Any]) -> None:
-        """Send a raw message to all connected clients."""
-        self._ensure_broadcast_loop()
-        await self._queue.put({"payload": message, "feedback_only": False})
+        """Send a raw message to all connected clients.
+
+        Raw messages need no analysis, so they fan out immediately instead of
+        taking a hop through the broadcast queue.
+        """
+        await self._broadcast(message, feedback_only=False)
 
     async def integrate_field(self, pad_vec: Any) -> Dict[str, Any]:
         """Integrate a PAD vector into the astro field and broadcast feedback."""
         state = self._astro_field.integrate(pad_vec)
         self._ensure_broadcast_loop()
-        await self._queue.put({"state": state})
+        self._pending_states.append(state)
+        self._state_ready.set()
         return state
 
+    def invalidate_preferences(self, profile_id: str) -> None:
+        """Drop the cached feedback preference after it has been changed."""
+        self._pref_cache.pop(profile_id, None)
+
     async def snapshot(self) -> Dict[str, Any]:
         return self._astro_field.snapshot()
 
     def analyze_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        baseline = self._baseline_analysis(state)
-        analysis = dict(baseline)
+        # The baseline dict is freshly built, so it is safe to extend in place.
+        analysis = baseline = self._baseline_analysis(state)
+        baseline_tone = baseline["tone"]
+        baseline_intensity = baseline["intensity"]
 
         bucket_key = ""
         strategy = "baseline"
@@ -124,22 +175,22 @@ class NeuroFeedbackHub:
             bucket_key = compute_bucket_key(
                 datetime.utcnow(),
                 self._current_user_count(),
-                baseline.get("pad", [0.0, 0.0, 0.0]),
+                baseline["pad"],
             )
             tone, intensity = mirror_loop.choose_action(
                 bucket_key=bucket_key,
-                fallback_tone=baseline["tone"],
-                fallback_intensity=baseline["intensity"],
+                fallback_tone=baseline_tone,
+                fallback_intensity=baseline_intensity,
             )
             tone = str(tone)
             intensity = float(intensity)
 
-            if tone != baseline["tone"] or abs(intensity - baseline["intensity"]) > 1e-6:
+            if tone != baseline_tone or abs(intensity - baseline_intensity) > 1e-6:
                 strategy = "mirror"
 
+            analysis["message"] = _FEEDBACK_MESSAGES.get(tone, baseline["message"])
             analysis["tone"] = tone
             analysis["intensity"] = round(max(0.0, min(1.0, intensity)), 3)
-            analysis["message"] = _FEEDBACK_MESSAGES.get(tone, baseline["message"])
 
         analysis["mirror"] = {
             "bucket_key": bucket_key,
@@ -149,42 +200,81 @@ class NeuroFeedbackHub:
         return analysis
 
     def _baseline_analysis(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        entropy = float(state.get("entropy", 0.0))
-        coherence = float(state.get("coherence", 0.0))
-        pad = state.get("pad_avg", [0.0, 0.0, 0.0])
+        # AstroField states already carry exact floats/ints; coercion is only
+        # needed for states that arrive from elsewhere.
+        entropy = state.get("entropy", 0.0)
+        if type(entropy) is not float:
+            entropy = float(entropy)
+        coherence = state.get("coherence", 0.0)
+        if type(coherence) is not float:
+            coherence = float(coherence)
+        pad = state.get("pad_avg", _DEFAULT_PAD)
 
         if entropy > 0.7:
-            tone = "warm"
+            tone, message = _TONE_TABLE[_WARM]
         elif coherence > 0.8:
-            tone = "cool"
+            tone, message = _TONE_TABLE[_COOL]
         else:
-            tone = "neutral"
+            tone, message = _TONE_TABLE[_NEUTRAL]
+
+        intensity = (coherence + (1.0 - entropy)) / 2
+        if intensity < 0.0:
+            intensity = 0.0
+        elif intensity > 1.0:
+            intensity = 1.0
+
+        if len(pad) >= 3:
+            p, a, d = pad[0], pad[1], pad[2]
+            if type(p) is float and type(a) is float and type(d) is float:
+                pad_values = [p, a, d]
+            else:
+                pad_values = [float(p), float(a), float(d)]
+        else:
+            pad_values = [float(value) for value in pad]
 
-        intensity = max(0.0, min(1.0, (coherence + (1.0 - entropy)) / 2))
+        ts = state.get("ts")
+        ts = time.time_ns() // 1_000_000_000 if ts is None else int(ts)
+        samples = state.get("samples", 0)
+        if type(samples) is not int:
+            samples = int(samples)
 
         return {
             "tone": tone,
+            "message": message,
             "intensity": round(intensity, 3),
-            "pad": [float(value) for value in pad[:3]],
+            "pad": pad_values,
             "entropy": round(entropy, 3),
             "coherence": round(coherence, 3),
-            "ts": int(state.get("ts", time.time())),
-            "samples": int(state.get("samples", 0)),
+            "ts": ts,
+            "samples": samples,
         }
 
     def _ensure_broadcast_loop(self) -> None:
         if self._broadcast_task is None or self._broadcast_task.done():
             self._broadcast_task = asyncio.create_task(self._broadcast_loop())
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reap_loop())
+
+    async def _reap_loop(self) -> None:
+        while True:
+            await asyncio.sleep(_REAP_INTERVAL)
+            async with self._lock:
+                closed = [ws for ws in self._connections if not _is_open(ws)]
+                for websocket in closed:
+                    del self._connections[websocket]
+            if closed:
+                logger.debug("Reaped %d closed feedback sockets", len(closed))
 
     async def _broadcast_loop(self) -> None:
         while True:
-            item = await self._queue.get()
-            if "state" in item:
-                state = item["state"]
-                await self._handle_state(state)
-            else:
-                payload = item["payload"]
-                await self._broadcast(payload, feedback_only=item.get("feedback_only", False))
+            await self._state_ready.wait()
+            self._state_ready.clear()
+            # Drain everything that arrived since the last wakeup, yielding
+            # between states so request handlers are not starved by a burst.
+            pending = self._pending_states
+            while pending:
+                await self._handle_state(pending.popleft())
+                await asyncio.sleep(0)
 
     async def _handle_state(self, state: Dict[str, Any]) -> None:
         analysis = self.analyze_state(state)
@@ -234,7 +324,7 @@ class NeuroFeedbackHub:
         except Exception as e:
             logger.error("Failed to record analytics snapshot: %s", e)
 
-        now = time.monotonic()
+        now_ns = time.monotonic_ns()
         should_send = False
 
         if not self._last_payload:
@@ -244,35 +334,59 @@ class NeuroFeedbackHub:
             tone_changed = analysis.get("tone") != last_data.get("tone")
             intensity_changed = abs(analysis.get("intensity", 0.0) - last_data.get("intensity", 0.0))
             should_send = tone_changed or intensity_changed > self._change_threshold
-            if not should_send and now - self._last_sent_ts >= self._interval:
+            if not should_send and now_ns - self._last_sent_ns >= self._interval_ns:
                 should_send = True
 
         if not should_send:
             return
 
-        await self._broadcast(payload, feedback_only=True)
+        frame = _encode_frame(payload)
+        await self._broadcast(payload, feedback_only=True, frame=frame)
         self._last_payload = payload
-        self._last_sent_ts = now
+        self._last_frame = frame
+        self._last_sent_ns = now_ns
         self._last_state = state
         self._last_analysis = analysis
 
-    async def _broadcast(self, payload: Dict[str, Any], *, feedback_only: bool) -> None:
+    async def _broadcast(
+        self,
+        payload: Dict[str, Any],
+        *,
+        feedback_only: bool,
+        frame: str | None = None,
+    ) -> None:
         if feedback_only and not _is_feature_globally_enabled():
             logger.debug("feedback loop disabled globally; skipping broadcast")
             return
 
-        stale: list[WebSocket] = []
+        # Hold the lock only long enough to snapshot the connections.
         async with self._lock:
-            items = list(self._connections.items())
+            items = tuple(self._connections.items())
+        if items and frame is None:
+            # Serialize once per broadcast rather than once per socket.
+            frame = _encode_frame(payload)
+        targets: list[WebSocket] = []
+        sends = []
+        stale: set[WebSocket] = set()
+        now = time.monotonic()
         for websocket, info in items:
-            if feedback_only and not self._should_send_feedback(websocket):
+            if not _is_open(websocket):
+                stale.add(websocket)
+                continue
+            if feedback_only and not self._feedback_enabled_for(info, now):
                 profile_id = info.profile_id or "anonymous"
                 logger.debug("Skipping feedback broadcast for profile %s (opted out)", profile_id)
                 continue
-            try:
-                await websocket.send_json(payload)
-            except (WebSocketDisconnect, RuntimeError):
-                stale.append(websocket)
+            targets.append(websocket)
+            sends.append(info.send(websocket, frame))
+
+        # Fan out concurrently so one slow socket does not delay the rest.
+        results = await asyncio.gather(*sends, return_exceptions=True)
+        for websocket, result in zip(targets, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, (WebSocketDisconnect, RuntimeError)):
+                    logger.warning("Dropping feedback socket after send failure: %r", result)
+                stale.add(websocket)
         if stale:
             async with self._lock:
                 for websocket in stale:
@@ -286,7 +400,20 @@ class NeuroFeedbackHub:
         info = self._connections.get(websocket)
         if not info:
             return False
-        return info.is_feedback_enabled()
+        return self._feedback_enabled_for(info, time.monotonic())
+
+    def _feedback_enabled_for(self, info: _ConnectionInfo, now: float) -> bool:
+        profile_id = info.profile_id
+        if not profile_id:
+            return True
+        cached = self._pref_cache.get(profile_id)
+        if cached is not None and now - cached[0] < _PREF_CACHE_TTL:
+            return cached[1]
+        enabled = info.is_feedback_enabled()
+        if len(self._pref_cache) >= _PREF_CACHE_SIZE:
+            self._pref_cache.clear()
+        self._pref_cache[profile_id] = (now, enabled)
+        return enabled
 
     def _current_user_count(self) -> int:
         return len(self._connections)
@@ -1,7 +1,8 @@
 """Internationalization (i18n) support for liminal-you."""
 from __future__ import annotations
 
-from typing import Dict, Literal
+import sys
+from typing import Dict, Literal, Tuple
 
 Language = Literal["ru", "en", "zh"]
 
@@ -188,6 +189,22 @@ EMOTION_TRANSLATIONS: Dict[str, Dict[Language, str]] = {
 }
 
 
+_LANGUAGES: Tuple[Language, ...] = ("ru", "en", "zh")
+_LANGUAGE_INDEX: Dict[str, int] = {language: index for index, language in enumerate(_LANGUAGES)}
+_EMPTY: Dict[str, str] = {}
+
+# Flat lookup tables: one dict probe per call, then a tuple index by language.
+# Keys are interned so call sites passing literal keys match by identity.
+_TRANSLATION_TABLE: Dict[str, Tuple[str, ...]] = {
+    sys.intern(key): tuple(TRANSLATIONS[language].get(key, key) for language in _LANGUAGES)
+    for key in {key for table in TRANSLATIONS.values() for key in table}
+}
+_EMOTION_TABLE: Dict[str, Tuple[str, ...]] = {
+    sys.intern(emotion): tuple(names[language] for language in _LANGUAGES)
+    for emotion, names in EMOTION_TRANSLATIONS.items()
+}
+
+
 def translate(key: str, language: Language = "ru") -> str:
     """Translate a key to the specified language.
 
@@ -198,7 +215,10 @@ def translate(key: str, language: Language = "ru") -> str:
     Returns:
         Translated string or key if not found
     """
-    return TRANSLATIONS.get(language, {}).get(key, key)
+    try:
+        return _TRANSLATION_TABLE[key][_LANGUAGE_INDEX[language]]
+    except KeyError:
+        return key
 
 
 def translate_emotion(emotion: str, language: Language = "ru") -> str:
@@ -211,8 +231,14 @@ def translate_emotion(emotion: str, language: Language = "ru") -> str:
     Returns:
         Translated emotion name
     """
-    emotion_lower = emotion.strip().lower()
-    return EMOTION_TRANSLATIONS.get(emotion_lower, {}).get(language, emotion)
+    index = _LANGUAGE_INDEX.get(language)
+    if index is None:
+        return emotion
+    # Most callers already pass the canonical lower-case name.
+    row = _EMOTION_TABLE.get(emotion) or _EMOTION_TABLE.get(emotion.strip().lower())
+    if row is None:
+        return emotion
+    return row[index]
 
 
 def get_all_translations(language: Language = "ru") -> Dict[str, str]:
@@ -224,7 +250,7 @@ def get_all_translations(language: Language = "ru") -> Dict[str, str]:
     Returns:
         Dictionary of all translations
     """
-    return TRANSLATIONS.get(language, {})
+    return TRANSLATIONS.get(language, _EMPTY)
 
 
 def get_supported_languages() -> list[Language]:
@@ -233,4 +259,4 @@ def get_supported_languages() -> list[Language]:
     Returns:
         List of language codes
     """
-    return ["ru", "en", "zh"]
+    return list(_LANGUAGES)
@@ -1,9 +1,10 @@
 """LiminalDB integration for liminal-you."""
-from .client import LiminalDBClient, get_liminaldb_client, Impulse, ResonantModel
+from .client import LiminalDBClient, LiminalDBClientPool, get_liminaldb_client, Impulse, ResonantModel
 from .storage import LiminalDBStorage
 
 __all__ = [
     "LiminalDBClient",
+    "LiminalDBClientPool",
     "get_liminaldb_client",
     "Impulse",
     "ResonantModel",
@@ -2,12 +2,14 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
+from collections import deque
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
 
 import cbor2
+import orjson
 import websockets
 from websockets.client import WebSocketClientProtocol
 
@@ -15,6 +17,13 @@ from ..config import settings
 
 logger = logging.getLogger(__name__)
 
+# LiminalDB speaks CBOR over binary frames and may fall back to JSON text
+# frames. Both cbor2 and orjson are C-backed; the functions are bound once
+# here and shared by every command and the event listener.
+_encode = cbor2.dumps
+_cbor_loads = cbor2.loads
+_json_loads = orjson.loads
+
 
 @dataclass
 class Impulse:
@@ -66,8 +75,19 @@ class LiminalDBClient:
         self.url = url or settings.liminaldb_url
         self._ws: WebSocketClientProtocol | None = None
         self._connected = False
+        # Only held while a frame is queued and written, so the order of
+        # _pending always matches the order of frames on the wire.
         self._lock = asyncio.Lock()
+        # LiminalDB answers every frame exactly once and in order; each sent
+        # frame parks a future here that the listener resolves FIFO.
+        self._pending: Deque[asyncio.Future[Dict[str, Any]]] = deque()
+        self._listener: asyncio.Task[None] | None = None
+        self._decode: Callable[[bytes], Dict[str, Any]] = _cbor_loads
+        # Encoded impulse frames waiting for the next flush.
+        self._batch: List[bytes] = []
+        self._flush_task: asyncio.Task[None] | None = None
         self._event_handlers: Dict[str, List[callable]] = {}
+        self._request_timeout = settings.liminaldb_request_timeout_s
 
     async def connect(self) -> None:
         """Connect to LiminalDB WebSocket server."""
@@ -78,11 +98,12 @@ class LiminalDBClient:
             logger.info("Attempting to connect to LiminalDB at %s", self.url)
             self._ws = await websockets.connect(self.url)
             self._connected = True
+            # Commands go out as binary CBOR and the server answers in the
+            # frame type it was sent, so the listener decodes CBOR directly.
+            self._decode = _cbor_loads
             logger.info("Connected to LiminalDB at %s", self.url)
 
-            # Note: Event listener disabled for request-response pattern
-            # If needed, implement proper message routing with asyncio.Queue
-            # asyncio.create_task(self._listen_events())
+            self._listener = asyncio.create_task(self._listen_events())
         except Exception as e:
             logger.error("Failed to connect to LiminalDB: %s", e)
             raise
@@ -92,28 +113,52 @@ class LiminalDBClient:
         if self._ws:
             await self._ws.close()
             self._connected = False
+            if self._listener:
+                self._listener.cancel()
+                self._listener = None
+            if self._flush_task:
+                self._flush_task.cancel()
+                self._flush_task = None
+            self._batch.clear()
+            self._fail_pending(ConnectionError("LiminalDB connection closed"))
             logger.info("Disconnected from LiminalDB")
 
+    def _fail_pending(self, exc: Exception) -> None:
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(exc)
+                # Fire-and-forget impulses never await their future.
+                future.exception()
+
     async def _listen_events(self) -> None:
-        """Listen for events from LiminalDB."""
+        """Read every frame: replies resolve pending requests, the rest are events."""
         if not self._ws:
             return
 
         try:
+            decode = self._decode
             async for message in self._ws:
-                if isinstance(message, bytes):
-                    # CBOR format
-                    event = cbor2.loads(message)
-                else:
-                    # JSON format
-                    event = json.loads(message)
-
-                await self._handle_event(event)
+                try:
+                    frame = decode(message)
+                except TypeError:
+                    # Text frames carry JSON rather than CBOR.
+                    frame = _json_loads(message)
+                if "ev" in frame or not self._pending:
+                    await self._handle_event(frame)
+                    continue
+                future = self._pending.popleft()
+                if not future.done():
+                    future.set_result(frame)
         except websockets.exceptions.ConnectionClosed:
             logger.info("LiminalDB connection closed")
             self._connected = False
         except Exception as e:
             logger.error("Error in event listener: %s", e)
+            # Nothing reads the socket any more, so later requests would
+            # never get a reply; fail them up front instead.
+            self._connected = False
+        self._fail_pending(ConnectionError("LiminalDB connection closed"))
 
     async def _handle_event(self, event: Dict[str, Any]) -> None:
         """Handle incoming event from LiminalDB."""
@@ -121,32 +166,63 @@ class LiminalDBClient:
         if not event_type:
             return
 
-        handlers = self._event_handlers.get(event_type, [])
-        for handler in handlers:
-            try:
-                await handler(event)
-            except Exception as e:
-                logger.error("Error in event handler for %s: %s", event_type, e)
+        handlers = self._event_handlers.get(event_type)
+        if not handlers:
+            return
+
+        # Run subscribers concurrently; one failing handler does not affect the rest.
+        results = await asyncio.gather(
+            *(handler(event) for handler in handlers), return_exceptions=True
+        )
+        for handler, result in zip(handlers, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "Error in event handler %s for %s: %s",
+                    getattr(handler, "__qualname__", repr(handler)),
+                    event_type,
+                    result,
+                )
 
     def on_event(self, event_type: str, handler: callable) -> None:
         """Register event handler."""
-        if event_type not in self._event_handlers:
-            self._event_handlers[event_type] = []
-        self._event_handlers[event_type].append(handler)
+        self._event_handlers.setdefault(event_type, []).append(handler)
 
     async def send_impulse(self, impulse: Impulse) -> Dict[str, Any]:
-        """Send impulse to LiminalDB."""
+        """Send impulse to LiminalDB.
+
+        Impulses are buffered and written back-to-back by a single flush on
+        the next loop iteration, so a burst takes the lock once.
+        """
         if not self._connected or not self._ws:
             raise RuntimeError("Not connected to LiminalDB")
 
-        async with self._lock:
-            # Send as CBOR
-            message = cbor2.dumps(impulse.to_dict())
-            await self._ws.send(message)
+        self._batch.append(_encode(impulse.to_dict()))
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_batch())
+        return {"status": "ok"}
 
-            # Wait for response (for now, we'll just return success)
-            # In production, implement proper request/response correlation
-            return {"status": "ok"}
+    async def _flush_batch(self) -> None:
+        try:
+            async with self._lock:
+                self._flush_task = None
+                await self._write_batch()
+        except Exception as e:
+            logger.error("Failed to send impulses to LiminalDB: %s", e)
+
+    async def _write_batch(self) -> None:
+        """Write buffered impulse frames; the caller holds ``_lock``."""
+        batch, self._batch = self._batch, []
+        create_future = asyncio.get_running_loop().create_future
+        for frame in batch:
+            # The reply is still read (and discarded) by the listener so that
+            # it cannot be mistaken for the answer to a later command.
+            future = create_future()
+            self._pending.append(future)
+            try:
+                await self._ws.send(frame)
+            except Exception:
+                self._pending.remove(future)
+                raise
 
     async def query(self, pattern: str, strength: float = 0.7, tags: List[str] | None = None) -> Dict[str, Any]:
         """Send Query impulse."""
@@ -178,53 +254,119 @@ class LiminalDBClient:
         )
         return await self.send_impulse(impulse)
 
-    async def awaken_get(self, model_id: str) -> Dict[str, Any]:
-        """Get ResonantModel state."""
+    async def _send(self, message: Dict[str, Any]) -> asyncio.Future[Dict[str, Any]]:
+        """Write a CBOR frame and return the future for its reply."""
         if not self._connected or not self._ws:
             raise RuntimeError("Not connected to LiminalDB")
 
+        frame = _encode(message)
+        future: asyncio.Future[Dict[str, Any]] = asyncio.get_running_loop().create_future()
         async with self._lock:
-            command = {"cmd": "awaken.get", "args": {"id": model_id}}
-            message = cbor2.dumps(command)
-            await self._ws.send(message)
+            # Impulses buffered before this command go out first, keeping
+            # the wire order the same as the call order.
+            if self._batch:
+                await self._write_batch()
+            self._pending.append(future)
+            try:
+                await self._ws.send(frame)
+            except Exception:
+                self._pending.remove(future)
+                raise
+        return future
+
+    async def _request(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a command and wait for its reply.
+
+        The lock only covers the write, so several requests can be in
+        flight at once and their replies are matched in send order. A
+        request that times out keeps its slot in ``_pending`` (cancelled),
+        so its late reply is still consumed in order.
+        """
+        future = await self._send(command)
+        return await asyncio.wait_for(future, timeout=self._request_timeout)
 
-            # Wait for response
-            response = await self._ws.recv()
-            if isinstance(response, bytes):
-                return cbor2.loads(response)
-            return json.loads(response)
+    async def awaken_get(self, model_id: str) -> Dict[str, Any]:
+        """Get ResonantModel state."""
+        return await self._request({"cmd": "awaken.get", "args": {"id": model_id}})
 
     async def awaken_set(self, model: ResonantModel) -> Dict[str, Any]:
         """Set ResonantModel configuration."""
-        if not self._connected or not self._ws:
-            raise RuntimeError("Not connected to LiminalDB")
-
-        async with self._lock:
-            command = {"cmd": "awaken.set", "args": model.to_dict()}
-            message = cbor2.dumps(command)
-            await self._ws.send(message)
-
-            # Wait for response
-            response = await self._ws.recv()
-            if isinstance(response, bytes):
-                return cbor2.loads(response)
-            return json.loads(response)
+        return await self._request({"cmd": "awaken.set", "args": model.to_dict()})
 
     async def get_metrics(self) -> Dict[str, Any]:
         """Get current cluster metrics."""
-        if not self._connected or not self._ws:
-            raise RuntimeError("Not connected to LiminalDB")
+        return await self._request({"cmd": "metrics"})
+
+
+class LiminalDBClientPool:
+    """Small LIFO pool of connected clients.
+
+    The first client is the primary one: it is never closed by the pool
+    before ``close()`` and is where event handlers are registered. Further
+    connections are opened on demand up to ``max_size``.
+    """
+
+    def __init__(
+        self,
+        primary: LiminalDBClient | None = None,
+        *,
+        min_size: int | None = None,
+        max_size: int | None = None,
+    ):
+        self.primary = primary or get_liminaldb_client()
+        self.min_size = max(1, min_size or settings.liminaldb_pool_min_size)
+        self.max_size = max(self.min_size, max_size or settings.liminaldb_pool_max_size)
+        self._clients: List[LiminalDBClient] = [self.primary]
+        self._idle: List[LiminalDBClient] = [self.primary]
+        self._released = asyncio.Condition()
+
+    async def init(self) -> None:
+        """Connect the primary client and open connections up to ``min_size``."""
+        await self.primary.connect()
+        while len(self._clients) < self.min_size:
+            client = await self._open()
+            self._idle.append(client)
+
+    async def _open(self) -> LiminalDBClient:
+        client = LiminalDBClient(url=self.primary.url)
+        self._clients.append(client)
+        try:
+            await client.connect()
+        except Exception:
+            self._clients.remove(client)
+            raise
+        return client
 
-        async with self._lock:
-            command = {"cmd": "metrics"}
-            message = cbor2.dumps(command)
-            await self._ws.send(message)
-
-            # Wait for response
-            response = await self._ws.recv()
-            if isinstance(response, bytes):
-                return cbor2.loads(response)
-            return json.loads(response)
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[LiminalDBClient]:
+        """Check out a client for the duration of the block."""
+        client = await self._checkout()
+        try:
+            yield client
+        finally:
+            async with self._released:
+                self._idle.append(client)
+                self._released.notify()
+
+    async def _checkout(self) -> LiminalDBClient:
+        while True:
+            while self._idle:
+                client = self._idle.pop()
+                if client is self.primary or client._connected:
+                    return client
+                # Drop secondary connections that went away while idle.
+                self._clients.remove(client)
+            if len(self._clients) < self.max_size:
+                return await self._open()
+            async with self._released:
+                await self._released.wait_for(lambda: bool(self._idle))
+
+    async def close(self) -> None:
+        """Disconnect every client in the pool."""
+        clients, self._clients = self._clients, [self.primary]
+        self._idle = [self.primary]
+        for client in clients:
+            await client.disconnect()
 
 
 # Global client instance
@@ -1,28 +1,55 @@
 """LiminalDB storage adapter for liminal-you."""
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import time
 import uuid
-from typing import List
+from collections import deque
+from typing import Deque, List
 
+from ..config import settings
 from ..models.reflection import Reflection, ReflectionCreate
 from ..models.user import User
 from ..models.profile import Profile
-from .client import LiminalDBClient, get_liminaldb_client, Impulse, ResonantModel
+from .client import LiminalDBClient, LiminalDBClientPool, get_liminaldb_client, Impulse, ResonantModel
 
 logger = logging.getLogger(__name__)
 
+# How long a fetched astro/global state is served from memory.
+_ASTRO_CACHE_TTL = 0.5
+
 
 class LiminalDBStorage:
     """Storage adapter using LiminalDB as backend."""
 
-    def __init__(self, client: LiminalDBClient | None = None):
-        self.client = client or get_liminaldb_client()
-        self._reflection_cache: List[Reflection] = []
+    def __init__(self, client: LiminalDBClient | None = None, pool: LiminalDBClientPool | None = None):
+        if pool is None:
+            # An explicitly supplied client is used on its own, as a pool of one.
+            pool = (
+                LiminalDBClientPool(client, min_size=1, max_size=1)
+                if client is not None
+                else LiminalDBClientPool(get_liminaldb_client())
+            )
+        self.pool = pool
+        # Primary connection: receives events and serves the model setup.
+        self.client = pool.primary
+        # Ring buffer of recent reflections; LiminalDB holds the full history.
+        self._reflection_cache: Deque[Reflection] = deque(maxlen=settings.reflection_cache_cap)
+        # Side indexes over _reflection_cache for query_reflections(), kept
+        # in insertion order so an evicted reflection is always at the front.
+        self._by_emotion: dict[str, Deque[Reflection]] = {}
+        self._by_author: dict[str, Deque[Reflection]] = {}
         self._user_cache: dict[str, User] = {}
         self._profile_cache: dict[str, Profile] = {}
+        self._astro_cache: tuple[float, dict] | None = None
+        # Bumped by every write to the field; a read that started before a
+        # write must not store its (older) result in _astro_cache.
+        self._astro_generation = 0
+        # Resonance edges waiting to be merged into astro/global
+        self._pending_edges: List[tuple[str, str, float, asyncio.Future[None]]] = []
+        self._edge_flush: asyncio.Task[None] | None = None
         self._initialized = False
 
     async def initialize(self) -> None:
@@ -30,7 +57,7 @@ class LiminalDBStorage:
         if self._initialized:
             return
 
-        await self.client.connect()
+        await self.pool.init()
 
         # Create global astro field model
         astro_model = ResonantModel(
@@ -76,27 +103,27 @@ class LiminalDBStorage:
         # Auto-calculate PAD if not provided
         pad = payload.pad or map_label_to_pad(payload.emotion)
 
+        actual_author = author or payload.from_node
         reflection = Reflection(
             id=reflection_id,
-            author=author or payload.from_node,
+            author=actual_author,
             content=payload.message,
             emotion=payload.emotion,
             pad=pad,
         )
 
         # Store as impulse in LiminalDB
-        pattern = f"reflection/{payload.emotion}/{author or payload.from_node}"
         tags = [
             "reflection",
             payload.emotion,
-            author or payload.from_node,
+            actual_author,
             payload.to_user,
         ]
 
         # Encode reflection data in pattern for later retrieval
         # Pattern format: "reflection/<emotion>/<author>/<content_hash>"
-        content_hash = str(abs(hash(payload.message)))[:8]
-        pattern = f"reflection/{payload.emotion}/{author or payload.from_node}/{content_hash}"
+        content_hash = f"{hash(payload.message) & 0xFFFFFFFF:08x}"
+        pattern = f"reflection/{payload.emotion}/{actual_author}/{content_hash}"
 
         try:
             # Calculate strength from PAD
@@ -105,11 +132,14 @@ class LiminalDBStorage:
                 # Use pleasure and arousal to calculate strength
                 strength = (pad[0] + pad[1]) / 2
 
-            await self.client.write(
-                pattern=pattern,
-                strength=strength,
-                tags=tags,
-            )
+            # No round-trip here: the client buffers impulses and flushes a
+            # burst of writes together on the next loop iteration.
+            async with self.pool.acquire() as client:
+                await client.write(
+                    pattern=pattern,
+                    strength=strength,
+                    tags=tags,
+                )
 
             logger.info("Stored reflection %s in LiminalDB: %s", reflection_id, pattern)
         except Exception as e:
@@ -117,10 +147,23 @@ class LiminalDBStorage:
             # Continue anyway, keep in cache
 
         # Cache locally for fast retrieval
-        self._reflection_cache.append(reflection)
+        cache = self._reflection_cache
+        if len(cache) == cache.maxlen:
+            self._evict(cache[0])
+        cache.append(reflection)
+        self._by_emotion.setdefault(reflection.emotion, deque()).append(reflection)
+        self._by_author.setdefault(reflection.author, deque()).append(reflection)
 
         return reflection
 
+    def _evict(self, oldest: Reflection) -> None:
+        """Drop the oldest cached reflection from the side indexes."""
+        for index, key in ((self._by_emotion, oldest.emotion), (self._by_author, oldest.author)):
+            bucket = index[key]
+            bucket.popleft()
+            if not bucket:
+                del index[key]
+
     async def list_reflections(self) -> List[Reflection]:
         """List all reflections from cache."""
         # In a full implementation, query LiminalDB with Query impulse
@@ -139,19 +182,24 @@ class LiminalDBStorage:
         pattern = "/".join(pattern_parts)
 
         try:
-            await self.client.query(pattern=pattern, strength=0.6)
+            async with self.pool.acquire() as client:
+                await client.query(pattern=pattern, strength=0.6)
             logger.info("Queried reflections with pattern: %s", pattern)
         except Exception as e:
             logger.error("Failed to query reflections: %s", e)
 
-        # Filter from cache
-        results = self._reflection_cache
+        # Filter from cache via the side indexes
+        if emotion and author:
+            by_emotion = self._by_emotion.get(emotion, ())
+            by_author = self._by_author.get(author, ())
+            if len(by_emotion) <= len(by_author):
+                return [r for r in by_emotion if r.author == author]
+            return [r for r in by_author if r.emotion == emotion]
         if emotion:
-            results = [r for r in results if r.emotion == emotion]
+            return list(self._by_emotion.get(emotion, ()))
         if author:
-            results = [r for r in results if r.author == author]
-
-        return results
+            return list(self._by_author.get(author, ()))
+        return list(self._reflection_cache)
 
     async def add_user(self, user: User) -> None:
         """Store user as ResonantModel in LiminalDB."""
@@ -165,7 +213,8 @@ class LiminalDBStorage:
         )
 
         try:
-            await self.client.awaken_set(model)
+            async with self.pool.acquire() as client:
+                await client.awaken_set(model)
             logger.info("Created user model: user/%s", user.id)
         except Exception as e:
             logger.error("Failed to create user model: %s", e)
@@ -178,7 +227,8 @@ class LiminalDBStorage:
             return self._user_cache[user_id]
 
         try:
-            result = await self.client.awaken_get(f"user/{user_id}")
+            async with self.pool.acquire() as client:
+                result = await client.awaken_get(f"user/{user_id}")
             if result.get("status") in ("active", "primed", "sleeping"):
                 # Reconstruct user from model
                 tags = result.get("tags", [])
@@ -194,28 +244,45 @@ class LiminalDBStorage:
 
     async def update_astro_field(self, pad: List[float], entropy: float, coherence: float) -> None:
         """Update global astro field in LiminalDB."""
+        self._invalidate_astro()
         try:
             # Send affect impulse to update field
             pattern = f"astro/global/update"
             strength = coherence  # Use coherence as strength
 
-            await self.client.affect(
-                pattern=pattern,
-                strength=strength,
-                tags=["astro", "field", "update"],
-            )
+            async with self.pool.acquire() as client:
+                await client.affect(
+                    pattern=pattern,
+                    strength=strength,
+                    tags=["astro", "field", "update"],
+                )
 
             logger.debug("Updated astro field: entropy=%.2f, coherence=%.2f", entropy, coherence)
         except Exception as e:
             logger.error("Failed to update astro field: %s", e)
 
+    def _invalidate_astro(self) -> None:
+        self._astro_generation += 1
+        self._astro_cache = None
+
     async def get_astro_field_state(self) -> dict:
-        """Get current astro field state from LiminalDB."""
+        """Get current astro field state from LiminalDB.
+
+        A fetched state is reused for ``_ASTRO_CACHE_TTL`` seconds; local
+        writes to the field invalidate it.
+        """
+        cached = self._astro_cache
+        if cached is not None and time.monotonic() - cached[0] < _ASTRO_CACHE_TTL:
+            state = cached[1]
+            return {**state, "pad": list(state["pad"])}
+
+        generation = self._astro_generation
         try:
-            result = await self.client.awaken_get("astro/global")
+            async with self.pool.acquire() as client:
+                result = await client.awaken_get("astro/global")
             if result.get("status"):
                 traits = result.get("latent_traits", {})
-                return {
+                state = {
                     "pad": [
                         traits.get("pad_p", 0.5),
                         traits.get("pad_a", 0.35),
@@ -224,6 +291,9 @@ class LiminalDBStorage:
                     "entropy": traits.get("entropy", 0.0),
                     "coherence": traits.get("coherence", 1.0),
                 }
+                if generation == self._astro_generation:
+                    self._astro_cache = (time.monotonic(), state)
+                return {**state, "pad": list(state["pad"])}
         except Exception as e:
             logger.error("Failed to get astro field state: %s", e)
 
@@ -234,45 +304,89 @@ class LiminalDBStorage:
         }
 
     async def create_resonance_edge(self, from_user: str, to_user: str, weight: float) -> None:
-        """Create resonance edge between users in astro field."""
+        """Create resonance edge between users in astro field.
+
+        Edges requested in the same loop iteration are merged into a single
+        read-modify-write of the astro/global model.
+        """
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._pending_edges.append((from_user, to_user, weight, future))
+        if self._edge_flush is None:
+            self._edge_flush = asyncio.create_task(self._flush_edges())
+        await future
+
+    async def _flush_edges(self) -> None:
         try:
-            # Get current astro model
-            result = await self.client.awaken_get("astro/global")
-            edges = result.get("edges", [])
-
-            # Add new edge
-            edge = {"from": f"user/{from_user}", "to": f"user/{to_user}", "weight": weight}
-            edges.append(edge)
-
-            # Update model
-            model = ResonantModel(
-                id="astro/global",
-                edges=edges,
-                persistence="snapshot",
-                tags=["astro", "field", "global"],
-            )
-
-            await self.client.awaken_set(model)
-            logger.info("Created resonance edge: %s -> %s (weight=%.2f)", from_user, to_user, weight)
+            # Let concurrent callers join this batch before touching the model.
+            await asyncio.sleep(0)
+            # Batches are written one after another so no edge is lost between
+            # an awaken.get and the awaken.set that follows it.
+            while self._pending_edges:
+                batch, self._pending_edges = self._pending_edges, []
+                await self._write_edges(batch)
+        finally:
+            # Let the next caller start a new flush, and do not leave anyone
+            # waiting on edges this (cancelled) flush will never write.
+            self._edge_flush = None
+            pending, self._pending_edges = self._pending_edges, []
+            for *_, future in pending:
+                if not future.done():
+                    future.set_exception(RuntimeError("Resonance edge flush was cancelled"))
+
+    async def _write_edges(self, batch: List[tuple[str, str, float, asyncio.Future[None]]]) -> None:
+        try:
+            # One connection for the read and the write keeps them in order.
+            async with self.pool.acquire() as client:
+                # Get current astro model
+                result = await client.awaken_get("astro/global")
+                edges = result.get("edges", [])
+
+                # Add new edges
+                for from_user, to_user, weight, _ in batch:
+                    edges.append({"from": f"user/{from_user}", "to": f"user/{to_user}", "weight": weight})
+
+                # Update model
+                model = ResonantModel(
+                    id="astro/global",
+                    edges=edges,
+                    persistence="snapshot",
+                    tags=["astro", "field", "global"],
+                )
+
+                await client.awaken_set(model)
+            self._invalidate_astro()
+            for from_user, to_user, weight, _ in batch:
+                logger.info("Created resonance edge: %s -> %s (weight=%.2f)", from_user, to_user, weight)
         except Exception as e:
             logger.error("Failed to create resonance edge: %s", e)
+        finally:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_result(None)
 
     async def close(self) -> None:
         """Close LiminalDB connection."""
         if self._initialized:
-            await self.client.disconnect()
+            await self.pool.close()
             self._initialized = False
             logger.info("LiminalDB storage closed")
 
 
 # Global storage instance
 _storage: LiminalDBStorage | None = None
+_storage_lock = asyncio.Lock()
 
 
 async def get_storage() -> LiminalDBStorage:
     """Get global LiminalDB storage instance."""
     global _storage
-    if _storage is None:
-        _storage = LiminalDBStorage()
-        await _storage.initialize()
+    if _storage is not None:
+        return _storage
+    # Concurrent first callers wait here so only one connects; the instance
+    # is published only once it is initialized.
+    async with _storage_lock:
+        if _storage is None:
+            storage = LiminalDBStorage()
+            await storage.initialize()
+            _storage = storage
     return _storage
@@ -5,6 +5,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
+from .mirror import close_mirror_loop
+from .mirror.manager import init_mirror_manager
 
 logger = logging.getLogger(__name__)
 from .routes.analytics import router as analytics_router
@@ -19,6 +21,21 @@ from .routes.mirror import router as mirror_router
 from .routes.witness import router as witness_router
 from .routes.product_metrics import router as product_metrics_router
 
+# (router, prefix, tags) in registration order
+_ROUTERS = (
+    (analytics_router, "/api", ["analytics"]),
+    (auth_router, "/api", ["auth"]),
+    (emotions_router, "/api", ["emotions"]),
+    (feed_router, "/api", ["feed"]),
+    (i18n_router, "/api", ["i18n"]),
+    (mirror_router, "/api", ["mirror"]),
+    (reflection_router, "/api", ["reflections"]),
+    (profile_router, "/api", ["profiles"]),
+    (witness_router, "", ["witness"]),
+    (product_metrics_router, "", ["product"]),
+    (feedback_ws_router, "", ["feedback"]),
+)
+
 # Import LiminalDB storage if enabled
 if settings.liminaldb_enabled:
     from .liminaldb.storage import get_storage
@@ -34,9 +51,19 @@ async def lifespan(app: FastAPI):
         app.state.storage = storage
         logger.info("LiminalDB storage initialized at %s", settings.liminaldb_url)
 
+    # Create the SQLite mirror tables here rather than on the first request.
+    app.state.mirror_manager = await init_mirror_manager()
+
+    # Build the OpenAPI schema now; FastAPI caches it, so the first request
+    # to /docs or /openapi.json does not pay for generating it.
+    app.openapi()
+
     yield
 
     # Shutdown
+    # Mirror episodes are written in batches; do not drop the last one.
+    await close_mirror_loop()
+
     if settings.liminaldb_enabled and hasattr(app.state, "storage"):
         await app.state.storage.close()
         logger.info("LiminalDB storage closed")
@@ -57,17 +84,8 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    app.include_router(analytics_router, prefix="/api", tags=["analytics"])
-    app.include_router(auth_router, prefix="/api", tags=["auth"])
-    app.include_router(emotions_router, prefix="/api", tags=["emotions"])
-    app.include_router(feed_router, prefix="/api", tags=["feed"])
-    app.include_router(i18n_router, prefix="/api", tags=["i18n"])
-    app.include_router(mirror_router, prefix="/api", tags=["mirror"])
-    app.include_router(reflection_router, prefix="/api", tags=["reflections"])
-    app.include_router(profile_router, prefix="/api", tags=["profiles"])
-    app.include_router(witness_router, tags=["witness"])
-    app.include_router(product_metrics_router, tags=["product"])
-    app.include_router(feedback_ws_router, tags=["feedback"])
+    for router, prefix, tags in _ROUTERS:
+        app.include_router(router, prefix=prefix, tags=tags)
 
     return app
 
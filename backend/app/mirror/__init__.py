@@ -1,23 +1,13 @@
 """Mirror loop package exposing singleton loop."""
 from __future__ import annotations
 
-import importlib.util
-import sys
-from pathlib import Path
-
 from .loop import MirrorLoop as AsyncMirrorLoop
 from .repository import MirrorRepository
 from .learner import MirrorPolicyLearner
 from .tables import metadata
+from .. import mirror_legacy as legacy_mirror
 from ..db import get_engine
 
-_legacy_path = Path(__file__).resolve().parent.parent / "mirror.py"
-_spec = importlib.util.spec_from_file_location("app._mirror_legacy", _legacy_path)
-legacy_mirror = importlib.util.module_from_spec(_spec)  # type: ignore[arg-type]
-assert _spec and _spec.loader  # for mypy/static hints
-sys.modules[_spec.name] = legacy_mirror  # type: ignore[index]
-_spec.loader.exec_module(legacy_mirror)  # type: ignore[union-attr]
-
 FieldSnapshot = legacy_mirror.FieldSnapshot
 MirrorEvent = legacy_mirror.MirrorEvent
 PolicyEntry = legacy_mirror.PolicyEntry
@@ -39,6 +29,12 @@ def get_mirror_loop() -> MirrorLoop:
     return _loop
 
 
+async def close_mirror_loop() -> None:
+    """Write out mirror episodes still queued for the database."""
+    if _loop is not None:
+        await _loop.repository.flush()
+
+
 __all__ = [
     "FieldSnapshot",
     "MirrorEvent",
@@ -48,6 +44,7 @@ __all__ = [
     "mirror_loop",
     "MirrorLoop",
     "get_mirror_loop",
+    "close_mirror_loop",
     "MirrorRepository",
     "MirrorPolicyLearner",
     "metadata",
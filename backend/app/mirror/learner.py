@@ -2,36 +2,49 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 
+from ..config import settings
 from .repository import MirrorRepository
 
 logger = logging.getLogger(__name__)
 
 
 class MirrorPolicyLearner:
-    """Periodic learner that refreshes the policy table from mirror events."""
+    """Rebuilds the policy table from mirror events on demand.
 
-    def __init__(self, repository: MirrorRepository, interval: float = 60.0) -> None:
+    The repository folds every new event into the policy as it is inserted,
+    so a full rebuild is only a repair step (``MirrorLoop.run_learning_cycle``).
+    """
+
+    def __init__(self, repository: MirrorRepository) -> None:
         self._repository = repository
-        self._interval = interval
-        self._task: asyncio.Task[None] | None = None
         self._lock = asyncio.Lock()
+        self._retry_delay = settings.mirror_rebuild_retry_s
+        self._max_retry_delay = settings.mirror_rebuild_retry_max_s
+        self._delay = self._retry_delay
+        self._retry_at = 0.0
 
-    async def run_once(self) -> None:
+    async def run_once(self) -> bool:
         async with self._lock:
             try:
                 await self._repository.rebuild_policy()
             except Exception as exc:  # pragma: no cover - defensive logging
-                logger.exception("Mirror policy rebuild failed: %%s", exc)
-
-    async def _loop(self) -> None:
-        while True:
-            await asyncio.sleep(self._interval)
-            await self.run_once()
-
-    def ensure_running(self) -> None:
-        if self._task is None or self._task.done():
-            self._task = asyncio.create_task(self._loop())
-
-    async def trigger_rebuild(self) -> None:
-        await self.run_once()
+                logger.exception("Mirror policy rebuild failed: %s", exc)
+                return False
+            return True
+
+    async def trigger_rebuild(self) -> bool:
+        """Rebuild now unless a recent failure is still backing off."""
+        now = time.monotonic()
+        if now < self._retry_at:
+            logger.debug("Skipping mirror policy rebuild for %.0fs after a failure", self._retry_at - now)
+            return False
+        if await self.run_once():
+            self._delay = self._retry_delay
+            self._retry_at = 0.0
+            return True
+        # Do not hit a failing database again at the same cadence.
+        self._retry_at = time.monotonic() + self._delay
+        self._delay = min(self._delay * 2, self._max_retry_delay)
+        return False
@@ -3,23 +3,29 @@ from __future__ import annotations
 import asyncio
 import logging
 import random
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, Set
 
 from .learner import MirrorPolicyLearner
 from .repository import MirrorRepository
 from .utils import (
     MirrorEpisode,
+    PolicyRecord,
     bin_to_intensity,
     build_bucket_key,
     clamp,
-    compute_reward,
     intensity_to_bin,
+    reward_from,
 )
 
 logger = logging.getLogger(__name__)
 
+# Best-policy lookups per bucket are reused for this long between episodes.
+_POLICY_CACHE_TTL = 5.0
+_POLICY_CACHE_SIZE = 512
+
 
 @dataclass(slots=True)
 class _PendingAction:
@@ -50,6 +56,10 @@ class MirrorLoop:
         self._current_bucket: str | None = None
         self._current_source: str | None = None
         self._current_action: Dict[str, Any] | None = None
+        self._policy_cache: Dict[str, tuple[float, PolicyRecord | None]] = {}
+        # Policies change when a batch of episodes is committed, not when an
+        # episode is queued, so cached entries are dropped at that point.
+        repository.add_flush_listener(self._forget_policies)
 
     async def observe_state(self, state: Dict[str, Any]) -> None:
         episode: MirrorEpisode | None = None
@@ -60,32 +70,37 @@ class MirrorLoop:
         if episode:
             await self._repository.insert_event(episode)
 
+    def _forget_policies(self, bucket_keys: Set[str]) -> None:
+        for bucket_key in bucket_keys:
+            self._policy_cache.pop(bucket_key, None)
+
     def _build_episode(self, pending: _PendingAction, post_state: Dict[str, Any]) -> MirrorEpisode | None:
-        pre_pad = pending.pre_state.get("pad_avg") or [0.0, 0.0, 0.0]
+        pre_state = pending.pre_state
+        pre_pad = pre_state.get("pad_avg") or [0.0, 0.0, 0.0]
         post_pad = post_state.get("pad_avg") or [0.0, 0.0, 0.0]
-        pre = {
-            "coherence": float(pending.pre_state.get("coherence", 0.0)),
-            "entropy": float(pending.pre_state.get("entropy", 0.0)),
-        }
-        post = {
-            "coherence": float(post_state.get("coherence", 0.0)),
-            "entropy": float(post_state.get("entropy", 0.0)),
-        }
-        reward = compute_reward(pre, post)
-        pre_ts = int(pending.pre_state.get("ts", datetime.now(tz=timezone.utc).timestamp()))
-        post_ts = int(post_state.get("ts", pre_ts))
+        # Plain floats up front; the reward is straight scalar arithmetic.
+        pre_coh = float(pre_state.get("coherence", 0.0))
+        pre_ent = float(pre_state.get("entropy", 0.0))
+        post_coh = float(post_state.get("coherence", 0.0))
+        post_ent = float(post_state.get("entropy", 0.0))
+        reward = reward_from(pre_coh, pre_ent, post_coh, post_ent)
+        now = datetime.now(tz=timezone.utc)
+        pre_ts = pre_state.get("ts")
+        pre_ts = int(now.timestamp() if pre_ts is None else pre_ts)
+        post_ts = post_state.get("ts")
+        post_ts = pre_ts if post_ts is None else int(post_ts)
         dt_ms = max(0, (post_ts - pre_ts) * 1000)
         return MirrorEpisode(
-            ts=datetime.now(tz=timezone.utc),
+            ts=now,
             user_count=pending.user_count,
             tone=pending.tone,
             intensity=pending.intensity,
             intensity_bin=intensity_to_bin(pending.intensity),
             reward=reward,
-            pre_coh=pre["coherence"],
-            pre_ent=pre["entropy"],
-            post_coh=post["coherence"],
-            post_ent=post["entropy"],
+            pre_coh=pre_coh,
+            pre_ent=pre_ent,
+            post_coh=post_coh,
+            post_ent=post_ent,
             pre_pad=pre_pad,
             post_pad=post_pad,
             dt_ms=dt_ms,
@@ -100,10 +115,13 @@ class MirrorLoop:
         user_count: int,
         mirror_active: bool,
     ) -> Dict[str, Any]:
+        # The exploration coin does not depend on loop state, so it is drawn
+        # before taking the lock.
+        roll = self._rng.random()
         async with self._lock:
-            self._learner.ensure_running()
             pad = state.get("pad_avg") or [0.0, 0.0, 0.0]
-            ts = int(state.get("ts", datetime.now(tz=timezone.utc).timestamp()))
+            ts = state.get("ts")
+            ts = int(datetime.now(tz=timezone.utc).timestamp() if ts is None else ts)
             bucket_key = build_bucket_key(ts, user_count, pad)
             self._current_bucket = bucket_key
 
@@ -122,9 +140,9 @@ class MirrorLoop:
 
             chosen = None
             queried = False
-            if self._rng.random() > self._epsilon:
+            if roll > self._epsilon:
                 queried = True
-                chosen = await self._repository.get_best_policy(bucket_key)
+                chosen = await self._best_policy(bucket_key)
 
             if chosen:
                 tone = chosen.tone
@@ -132,10 +150,9 @@ class MirrorLoop:
                 source = "mirror"
             else:
                 tone = fallback["tone"]
-                intensity = fallback["intensity"]
+                intensity = clamp(float(fallback["intensity"]))
                 source = "fallback" if queried else "explore"
 
-            intensity = clamp(float(intensity))
             result = {
                 **fallback,
                 "tone": tone,
@@ -156,6 +173,17 @@ class MirrorLoop:
             )
             return result
 
+    async def _best_policy(self, bucket_key: str) -> PolicyRecord | None:
+        now = time.monotonic()
+        cached = self._policy_cache.get(bucket_key)
+        if cached is not None and now - cached[0] < _POLICY_CACHE_TTL:
+            return cached[1]
+        best = await self._repository.get_best_policy(bucket_key)
+        if len(self._policy_cache) >= _POLICY_CACHE_SIZE:
+            self._policy_cache.clear()
+        self._policy_cache[bucket_key] = (now, best)
+        return best
+
     async def register_action(
         self,
         state: Dict[str, Any],
@@ -191,6 +219,7 @@ class MirrorLoop:
 
     async def run_learning_cycle(self) -> None:
         await self._learner.trigger_rebuild()
+        self._policy_cache.clear()
 
     @property
     def repository(self) -> MirrorRepository:
@@ -9,13 +9,13 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from .policy import MirrorPolicyService
-from .storage import MirrorRepository, get_repository
+from .storage import MirrorRepository, get_repository, init_repository
 from .utils import EpisodeRecord, MirrorAction, MirrorState, derive_bucket_key
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class CurrentPolicySnapshot:
     bucket_key: str
     tone: str
@@ -31,7 +31,6 @@ class MirrorManager:
         self._policy = MirrorPolicyService(self._repository)
         self._pending: EpisodeRecord | None = None
         self._lock = asyncio.Lock()
-        self._learner_task: asyncio.Task[None] | None = None
         self._last_bucket_key: str | None = None
 
     async def observe_post_state(self, state_payload: dict) -> None:
@@ -59,15 +58,16 @@ class MirrorManager:
         user_count: int,
         mirror_allowed: bool,
     ) -> tuple[MirrorAction, str]:
-        await self._ensure_learner()
+        # Opted-out ticks use the fallback as-is and have no bucket, so skip
+        # parsing the state entirely.
+        if not mirror_allowed:
+            return fallback, ""
+
         now = datetime.now(timezone.utc)
         state = MirrorState.from_payload(state_payload)
         bucket_key = derive_bucket_key(now, user_count, state.pad)
         self._last_bucket_key = bucket_key
 
-        if not mirror_allowed:
-            return fallback, bucket_key
-
         action = await self._policy.choose_action(
             bucket_key,
             fallback,
@@ -93,22 +93,10 @@ class MirrorManager:
             )
 
     async def run_learning_cycle(self) -> None:
+        # Episodes already update their policy row as they are recorded; a
+        # full recalculation is only a repair step.
         await self._repository.recalculate_policies()
 
-    async def _ensure_learner(self) -> None:
-        if self._learner_task and not self._learner_task.done():
-            return
-        loop = asyncio.get_running_loop()
-        self._learner_task = loop.create_task(self._periodic_learner())
-
-    async def _periodic_learner(self) -> None:
-        while True:
-            await asyncio.sleep(60)
-            try:
-                await self._repository.recalculate_policies()
-            except Exception:  # pragma: no cover - defensive logging
-                logger.exception("mirror policy recalculation failed")
-
     async def current_policy_snapshot(self) -> Optional[CurrentPolicySnapshot]:
         if not self._last_bucket_key:
             return None
@@ -125,4 +113,19 @@ class MirrorManager:
         )
 
 
-mirror_manager = MirrorManager()
+_mirror_manager: MirrorManager | None = None
+
+
+async def init_mirror_manager() -> MirrorManager:
+    """Build the shared manager at startup so no request pays for the DDL."""
+    global _mirror_manager
+    if _mirror_manager is None:
+        _mirror_manager = MirrorManager(await init_repository())
+    return _mirror_manager
+
+
+def get_mirror_manager() -> MirrorManager:
+    """FastAPI dependency returning the manager built by init_mirror_manager()."""
+    if _mirror_manager is None:
+        raise RuntimeError("mirror manager not initialised; call init_mirror_manager() at startup")
+    return _mirror_manager
@@ -3,13 +3,17 @@ from __future__ import annotations
 
 import random
 from dataclasses import dataclass
-from typing import Iterable, Optional
+from typing import Callable, Iterable, Optional
 
 from .storage import MirrorRepository
 from .utils import MirrorAction
 
+# Intensity at the centre of each learned bin; every bin from 10 up caps at 0.99.
+_BIN_TO_INT = tuple(min(0.99, max(0.0, (b + 0.5) / 10)) for b in range(11))
+_LAST_BIN = len(_BIN_TO_INT) - 1
 
-@dataclass
+
+@dataclass(slots=True)
 class PolicyCandidate:
     tone: str
     intensity_bin: int
@@ -18,9 +22,17 @@ class PolicyCandidate:
 
 
 class MirrorPolicyService:
-    def __init__(self, repository: MirrorRepository, *, epsilon: float = 0.1) -> None:
+    def __init__(
+        self,
+        repository: MirrorRepository,
+        *,
+        epsilon: float = 0.1,
+        rng: Callable[[], float] | None = None,
+    ) -> None:
         self._repository = repository
         self._epsilon = epsilon
+        # A generator of its own rather than the module-level one shared app-wide.
+        self._rng = rng or random.Random().random
 
     async def choose_action(
         self,
@@ -31,7 +43,7 @@ class MirrorPolicyService:
     ) -> MirrorAction:
         """Choose action via epsilon-greedy policy."""
 
-        if random.random() < self._epsilon:
+        if self._rng() < self._epsilon:
             return fallback
 
         best = await self._repository.get_best_policy(bucket_key)
@@ -41,7 +53,7 @@ class MirrorPolicyService:
         intensity = candidate_intensity if candidate_intensity is not None else fallback.intensity
         # Align intensity with learned bin to avoid abrupt jumps
         if best.intensity_bin >= 0:
-            intensity = min(0.99, max(0.0, (best.intensity_bin + 0.5) / 10))
+            intensity = _BIN_TO_INT[min(best.intensity_bin, _LAST_BIN)]
 
         return MirrorAction(tone=best.tone, intensity=float(intensity), message=fallback.message)
 
@@ -3,16 +3,48 @@ from __future__ import annotations
 import asyncio
 from datetime import datetime, timezone
 import logging
-from typing import List, Sequence
+from typing import Callable, Dict, List, Sequence, Set, Tuple
 
-from sqlalchemy import Engine, func, select
+from sqlalchemy import Engine, bindparam, func, select
+from sqlalchemy.dialects import postgresql, sqlite
 
-from .tables import metadata, mirror_events, policy_table, causal_summary
+from ..config import settings
+from .tables import metadata, mirror_events, pad_values, policy_table, causal_summary, upgrade_schema
 from .utils import MirrorEpisode, PolicyRecord
 
 
 logger = logging.getLogger(__name__)
 
+# Dialects whose INSERT supports ON CONFLICT DO UPDATE.
+_UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Write statements are built once; executing the same objects keeps every
+# flush on the compiled-statement cache instead of rebuilding constructs.
+_EVENT_INSERT = mirror_events.insert()
+_POLICY_INSERT = policy_table.insert()
+_CAUSAL_INSERT = causal_summary.insert()
+_CAUSAL_MATCH = (causal_summary.c.bucket_key == bindparam("b_bucket_key")) & (
+    causal_summary.c.hint == bindparam("b_hint")
+)
+_CAUSAL_COUNT = select(causal_summary.c.count).where(_CAUSAL_MATCH)
+_CAUSAL_UPDATE = causal_summary.update().where(_CAUSAL_MATCH).values(count=bindparam("b_count"))
+
+
+def _policy_upsert(upsert):
+    """Policy insert that merges (batch average, batch count) into an existing row."""
+    stmt = upsert(policy_table)
+    current, incoming = policy_table.c, stmt.excluded
+    # On conflict the two averages are combined weighted by their counts.
+    return stmt.on_conflict_do_update(
+        index_elements=[current.bucket_key, current.tone, current.intensity_bin],
+        set_={
+            "reward_avg": (current.reward_avg * current.n + incoming.reward_avg * incoming.n)
+            / (current.n + incoming.n),
+            "n": current.n + incoming.n,
+            "updated_at": incoming.updated_at,
+        },
+    )
+
 
 class MirrorRepository:
     """Persistence helper for mirror loop artifacts."""
@@ -21,63 +53,183 @@ class MirrorRepository:
         self._engine = engine
         self._available = True
         try:
-            metadata.create_all(self._engine, checkfirst=True)
+            with self._engine.begin() as connection:
+                metadata.create_all(connection, checkfirst=True)
+                upgrade_schema(connection)
         except Exception as exc:  # pragma: no cover - defensive path when DB unavailable
             logger.warning("Mirror repository unavailable: %s", exc)
             self._available = False
+        # Episodes waiting for the next batched insert.
+        self._buffer: List[MirrorEpisode] = []
+        self._buffer_full = asyncio.Event()
+        self._flush_task: asyncio.Task[None] | None = None
+        self._batch_size = settings.mirror_batch_size
+        self._batch_delay = settings.mirror_batch_ms / 1000.0
+        self._flush_listeners: List[Callable[[Set[str]], None]] = []
+        upsert = _UPSERT_INSERTS.get(engine.dialect.name)
+        self._policy_upsert = _policy_upsert(upsert) if upsert is not None else None
+        if not engine.dialect.supports_statement_cache:
+            logger.warning("Dialect %s does not cache compiled statements", engine.dialect.name)
+
+    def add_flush_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        """Call ``listener`` with the bucket keys of each batch once it is committed."""
+        self._flush_listeners.append(listener)
 
     async def insert_event(self, episode: MirrorEpisode) -> None:
+        """Queue an episode; queued episodes are written in one transaction."""
         if not self._available:
             return
-        await asyncio.to_thread(self._insert_event_sync, episode)
-
-    def _insert_event_sync(self, episode: MirrorEpisode) -> None:
-        payload = {
-            "ts": episode.ts,
-            "user_count": episode.user_count,
-            "tone": episode.tone,
-            "intensity": episode.intensity,
-            "intensity_bin": episode.intensity_bin,
-            "reward": episode.reward,
-            "pre_coh": episode.pre_coh,
-            "pre_ent": episode.pre_ent,
-            "post_coh": episode.post_coh,
-            "post_ent": episode.post_ent,
-            "pre_pad": list(episode.pre_pad),
-            "post_pad": list(episode.post_pad),
-            "dt_ms": episode.dt_ms,
-            "bucket_key": episode.bucket_key,
-            "cause_text": episode.cause_text,
-        }
+        self._buffer.append(episode)
+        if len(self._buffer) >= self._batch_size:
+            self._buffer_full.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def _flush_loop(self) -> None:
+        try:
+            while self._buffer:
+                try:
+                    await asyncio.wait_for(self._buffer_full.wait(), timeout=self._batch_delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._buffer_full.clear()
+                episodes, self._buffer = self._buffer, []
+                try:
+                    await asyncio.to_thread(self._insert_events_sync, episodes)
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    logger.exception("Mirror event batch of %d failed: %s", len(episodes), exc)
+                    continue
+                buckets = {episode.bucket_key for episode in episodes}
+                for listener in self._flush_listeners:
+                    try:
+                        listener(buckets)
+                    except Exception as exc:
+                        logger.exception("Mirror flush listener failed: %s", exc)
+        finally:
+            # Otherwise insert_event() never starts another flush.
+            self._flush_task = None
+
+    async def flush(self) -> None:
+        """Wait until every queued episode has been written."""
+        if (self._flush_task is None or self._flush_task.done()) and self._buffer:
+            # Left behind by a cancelled flush.
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        task = self._flush_task
+        if task is not None:
+            self._buffer_full.set()
+            await asyncio.shield(task)
+
+    def _insert_events_sync(self, episodes: List[MirrorEpisode]) -> None:
+        rows = []
+        for episode in episodes:
+            pre_p, pre_a, pre_d = pad_values(episode.pre_pad)
+            post_p, post_a, post_d = pad_values(episode.post_pad)
+            rows.append(
+                {
+                    "ts": episode.ts,
+                    "user_count": episode.user_count,
+                    "tone": episode.tone,
+                    "intensity": episode.intensity,
+                    "intensity_bin": episode.intensity_bin,
+                    "reward": episode.reward,
+                    "pre_coh": episode.pre_coh,
+                    "pre_ent": episode.pre_ent,
+                    "post_coh": episode.post_coh,
+                    "post_ent": episode.post_ent,
+                    "pre_pad_p": pre_p,
+                    "pre_pad_a": pre_a,
+                    "pre_pad_d": pre_d,
+                    "post_pad_p": post_p,
+                    "post_pad_a": post_a,
+                    "post_pad_d": post_d,
+                    "dt_ms": episode.dt_ms,
+                    "bucket_key": episode.bucket_key,
+                    "cause_text": episode.cause_text,
+                }
+            )
+        # Per-key totals, so each policy and causal row is touched once per batch.
+        policy: Dict[Tuple[str, str, int], List] = {}
+        hints: Dict[Tuple[str, str], int] = {}
+        for episode in episodes:
+            key = (episode.bucket_key, episode.tone, episode.intensity_bin)
+            totals = policy.get(key)
+            if totals is None:
+                policy[key] = [float(episode.reward), 1, episode.ts]
+            else:
+                totals[0] += float(episode.reward)
+                totals[1] += 1
+                totals[2] = max(totals[2], episode.ts)
+            if episode.cause_text:
+                hint_key = (episode.bucket_key, episode.cause_text)
+                hints[hint_key] = hints.get(hint_key, 0) + 1
         if not self._available:
             return
         with self._engine.begin() as connection:
-            connection.execute(mirror_events.insert().values(**payload))
-            if episode.cause_text:
-                existing = connection.execute(
-                    select(causal_summary.c.count)
-                    .where(causal_summary.c.bucket_key == episode.bucket_key)
-                    .where(causal_summary.c.hint == episode.cause_text)
-                ).scalar()
+            connection.execute(_EVENT_INSERT, rows)
+            if self._policy_upsert is not None:
+                connection.execute(
+                    self._policy_upsert,
+                    [
+                        {
+                            "bucket_key": bucket_key,
+                            "tone": tone,
+                            "intensity_bin": intensity_bin,
+                            "reward_avg": reward_sum / count,
+                            "n": count,
+                            "updated_at": updated_at,
+                        }
+                        for (bucket_key, tone, intensity_bin), (reward_sum, count, updated_at) in policy.items()
+                    ],
+                )
+            else:
+                for key, (reward_sum, count, updated_at) in policy.items():
+                    self._fold_into_policy(connection, key, reward_sum, count, updated_at)
+            for (bucket_key, hint), count in hints.items():
+                params = {"b_bucket_key": bucket_key, "b_hint": hint}
+                existing = connection.execute(_CAUSAL_COUNT, params).scalar()
                 if existing is None:
-                    connection.execute(
-                        causal_summary.insert().values(
-                            bucket_key=episode.bucket_key,
-                            hint=episode.cause_text,
-                            count=1,
-                        )
-                    )
+                    connection.execute(_CAUSAL_INSERT, {"bucket_key": bucket_key, "hint": hint, "count": count})
                 else:
-                    connection.execute(
-                        causal_summary.update()
-                        .where(causal_summary.c.bucket_key == episode.bucket_key)
-                        .where(causal_summary.c.hint == episode.cause_text)
-                        .values(count=int(existing) + 1)
-                    )
+                    connection.execute(_CAUSAL_UPDATE, {**params, "b_count": int(existing) + count})
+
+    @staticmethod
+    def _fold_into_policy(
+        connection,
+        key: Tuple[str, str, int],
+        reward_sum: float,
+        count: int,
+        updated_at: datetime,
+    ) -> None:
+        """Merge ``count`` rewards summing to ``reward_sum`` into a policy row."""
+        bucket_key, tone, intensity_bin = key
+        match = (
+            (policy_table.c.bucket_key == bucket_key)
+            & (policy_table.c.tone == tone)
+            & (policy_table.c.intensity_bin == intensity_bin)
+        )
+        row = connection.execute(select(policy_table.c.reward_avg, policy_table.c.n).where(match)).first()
+        if row is None:
+            connection.execute(
+                policy_table.insert().values(
+                    bucket_key=bucket_key,
+                    tone=tone,
+                    intensity_bin=intensity_bin,
+                    reward_avg=reward_sum / count,
+                    n=count,
+                    updated_at=updated_at,
+                )
+            )
+        else:
+            n = int(row.n) + count
+            reward_avg = (float(row.reward_avg) * int(row.n) + reward_sum) / n
+            connection.execute(
+                policy_table.update().where(match).values(reward_avg=reward_avg, n=n, updated_at=updated_at)
+            )
 
     async def rebuild_policy(self) -> None:
         if not self._available:
             return
+        await self.flush()
         await asyncio.to_thread(self._rebuild_policy_sync)
 
     def _rebuild_policy_sync(self) -> None:
@@ -101,7 +253,7 @@ class MirrorRepository:
             now = datetime.now(timezone.utc)
             if result:
                 connection.execute(
-                    policy_table.insert(),
+                    _POLICY_INSERT,
                     [
                         {
                             "bucket_key": row.bucket_key,
@@ -115,10 +267,10 @@ class MirrorRepository:
                     ],
                 )
 
-    async def fetch_policies(self, bucket_key: str | None = None) -> List[PolicyRecord]:
+    async def fetch_policies(self, bucket_key: str | None = None, limit: int | None = None) -> List[PolicyRecord]:
         if not self._available:
             return []
-        rows = await asyncio.to_thread(self._fetch_policies_sync, bucket_key)
+        rows = await asyncio.to_thread(self._fetch_policies_sync, bucket_key, limit)
         return [
             PolicyRecord(
                 bucket_key=row.bucket_key,
@@ -131,17 +283,20 @@ class MirrorRepository:
             for row in rows
         ]
 
-    def _fetch_policies_sync(self, bucket_key: str | None) -> Sequence:
+    def _fetch_policies_sync(self, bucket_key: str | None, limit: int | None = None) -> Sequence:
         if not self._available:
             return []
         with self._engine.begin() as connection:
             query = select(policy_table).order_by(policy_table.c.bucket_key, policy_table.c.reward_avg.desc())
             if bucket_key:
                 query = query.where(policy_table.c.bucket_key == bucket_key)
+            if limit is not None:
+                query = query.limit(limit)
             return connection.execute(query).all()
 
     async def get_best_policy(self, bucket_key: str) -> PolicyRecord | None:
-        rows = await self.fetch_policies(bucket_key)
+        # Served by idx_policy_bucket_reward as a single index seek.
+        rows = await self.fetch_policies(bucket_key, limit=1)
         return rows[0] if rows else None
 
     async def fetch_events(
@@ -153,43 +308,46 @@ class MirrorRepository:
     ) -> List[MirrorEpisode]:
         if not self._available:
             return []
-        rows = await asyncio.to_thread(self._fetch_events_sync, start, end, limit)
-        return [
-            MirrorEpisode(
-                id=row.id,
-                ts=row.ts,
-                user_count=row.user_count,
-                tone=row.tone,
-                intensity=row.intensity,
-                intensity_bin=row.intensity_bin,
-                reward=row.reward,
-                pre_coh=row.pre_coh,
-                pre_ent=row.pre_ent,
-                post_coh=row.post_coh,
-                post_ent=row.post_ent,
-                pre_pad=row.pre_pad,
-                post_pad=row.post_pad,
-                dt_ms=row.dt_ms,
-                bucket_key=row.bucket_key,
-            )
-            for row in rows
-        ]
+        await self.flush()
+        return await asyncio.to_thread(self._fetch_events_sync, start, end, limit)
 
     def _fetch_events_sync(
         self,
         start: datetime | None,
         end: datetime | None,
         limit: int,
-    ) -> Sequence:
+    ) -> List[MirrorEpisode]:
         if not self._available:
             return []
-        with self._engine.begin() as connection:
-            query = select(mirror_events).order_by(mirror_events.c.ts.desc()).limit(limit)
-            if start:
-                query = query.where(mirror_events.c.ts >= start)
-            if end:
-                query = query.where(mirror_events.c.ts <= end)
-            return connection.execute(query).all()
+        query = select(mirror_events).order_by(mirror_events.c.ts.desc()).limit(limit)
+        if start:
+            query = query.where(mirror_events.c.ts >= start)
+        if end:
+            query = query.where(mirror_events.c.ts <= end)
+        # Rows are streamed in chunks and turned into episodes as they arrive,
+        # in the worker thread, instead of materializing every Row first.
+        with self._engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=100).execute(query)
+            return [
+                MirrorEpisode(
+                    id=row.id,
+                    ts=row.ts,
+                    user_count=row.user_count,
+                    tone=row.tone,
+                    intensity=row.intensity,
+                    intensity_bin=row.intensity_bin,
+                    reward=row.reward,
+                    pre_coh=row.pre_coh,
+                    pre_ent=row.pre_ent,
+                    post_coh=row.post_coh,
+                    post_ent=row.post_ent,
+                    pre_pad=(row.pre_pad_p, row.pre_pad_a, row.pre_pad_d),
+                    post_pad=(row.post_pad_p, row.post_pad_a, row.post_pad_d),
+                    dt_ms=row.dt_ms,
+                    bucket_key=row.bucket_key,
+                )
+                for row in result
+            ]
 
     async def count_distinct_buckets(self) -> int:
         if not self._available:
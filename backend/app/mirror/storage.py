@@ -2,30 +2,48 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import os
-from contextlib import contextmanager
+import struct
+from contextlib import AbstractAsyncContextManager, nullcontext
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import List, Optional
 
 from sqlalchemy import (
     Column,
     DateTime,
     Float,
+    Index,
     Integer,
+    LargeBinary,
     MetaData,
     String,
-    create_engine,
+    bindparam,
+    event,
     func,
     select,
+    text,
 )
-from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.orm import declarative_base
 
-from .utils import EpisodeRecord, MirrorAction, calculate_reward
+from .utils import EpisodeRecord, MirrorAction, MirrorState, calculate_reward
 
 _DEFAULT_URL = os.getenv("MIRROR_DB_URL", "sqlite:///./mirror_loop.db")
 
+# PAD vectors are stored as three little-endian float32 values.
+_PAD_FORMAT = struct.Struct("<3f")
+pack_pad = _PAD_FORMAT.pack
+
+
+def unpack_pad(raw: bytes) -> tuple[float, float, float]:
+    return _PAD_FORMAT.unpack(raw)
+
+
 metadata = MetaData()
 Base = declarative_base(metadata=metadata)
 
@@ -41,14 +59,19 @@ class MirrorEvent(Base):
     intensity_bin = Column(Integer, nullable=False)
     pre_coh = Column(Float, nullable=False)
     pre_ent = Column(Float, nullable=False)
-    pre_pad = Column(String(64), nullable=False)
+    pre_pad = Column(LargeBinary(12), nullable=False)
     post_coh = Column(Float, nullable=False)
     post_ent = Column(Float, nullable=False)
-    post_pad = Column(String(64), nullable=False)
+    post_pad = Column(LargeBinary(12), nullable=False)
     dt_ms = Column(Integer, nullable=False)
     bucket_key = Column(String(32), nullable=False, index=True)
     reward = Column(Float, nullable=False)
 
+    __table_args__ = (
+        Index("ix_events_ts", "ts"),
+        Index("ix_events_bucket_ts", "bucket_key", "ts"),
+    )
+
 
 class MirrorPolicy(Base):
     __tablename__ = "policy_table"
@@ -60,68 +83,132 @@ class MirrorPolicy(Base):
     n = Column(Integer, nullable=False)
     updated_at = Column(DateTime, nullable=False)
 
+    __table_args__ = (Index("ix_policy_bucket_reward", "bucket_key", "reward_avg"),)
+
+
+_EVENTS = MirrorEvent.__table__
+_POLICIES = MirrorPolicy.__table__
+
+
+def _text_pad(raw: str) -> bytes:
+    values = [float(part) for part in raw.split(",") if part.strip()][:3]
+    return pack_pad(*values, *(0.0,) * (3 - len(values)))
+
+
+def _upgrade_pad_columns(connection: Connection) -> None:
+    """Repack PAD vectors that older versions stored as "p,a,d" text."""
+    if connection.dialect.name != "sqlite":
+        return
+    rows = connection.execute(
+        text(
+            "SELECT id, pre_pad, post_pad FROM mirror_events"
+            " WHERE typeof(pre_pad) = 'text' OR typeof(post_pad) = 'text'"
+        )
+    ).all()
+    if not rows:
+        return
+    connection.execute(
+        _EVENTS.update()
+        .where(_EVENTS.c.id == bindparam("b_id"))
+        .values(pre_pad=bindparam("b_pre_pad"), post_pad=bindparam("b_post_pad")),
+        [
+            {
+                "b_id": row.id,
+                "b_pre_pad": _text_pad(row.pre_pad) if isinstance(row.pre_pad, str) else row.pre_pad,
+                "b_post_pad": _text_pad(row.post_pad) if isinstance(row.post_pad, str) else row.post_pad,
+            }
+            for row in rows
+        ],
+    )
+
+
+def _configure_sqlite(dbapi_connection, _record) -> None:
+    # WAL with synchronous=NORMAL syncs at checkpoints rather than on every
+    # commit and is still durable against application crashes.
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")
+    finally:
+        cursor.close()
+
 
 class MirrorRepository:
     """Encapsulates mirror event persistence and aggregation logic."""
 
     def __init__(self, url: str | None = None) -> None:
         self._url = url or _DEFAULT_URL
-        if self._url.startswith("sqlite"):
-            db_path = self._url.split("///", 1)[-1]
+        url_info = make_url(self._url)
+        in_memory = False
+        if url_info.get_backend_name() == "sqlite":
+            db_path = url_info.database
             if db_path and db_path != ":memory:":
                 Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-        self._engine: Engine = create_engine(self._url, future=True)
-        Base.metadata.create_all(self._engine)
+            # aiosqlite runs queries on its own connection thread, so the
+            # event loop awaits them directly instead of hopping through
+            # asyncio.to_thread. An in-memory database only exists on its one
+            # connection.
+            in_memory = db_path in (None, "", ":memory:")
+            pool_options = {"poolclass": StaticPool} if in_memory else {}
+            self._engine: AsyncEngine = create_async_engine(
+                url_info.set(drivername="sqlite+aiosqlite"),
+                pool_pre_ping=False,
+                **pool_options,
+            )
+            event.listen(self._engine.sync_engine, "connect", _configure_sqlite)
+        else:
+            # Other databases need an async driver in the URL, e.g. postgresql+asyncpg.
+            self._engine = create_async_engine(url_info)
+        self._session = async_sessionmaker(self._engine, expire_on_commit=False)
         self._lock = asyncio.Lock()
+        # Readers share the single in-memory connection with the writer, so
+        # there they have to queue behind it as well.
+        self._read_guard: AbstractAsyncContextManager = self._lock if in_memory else nullcontext()
 
-    @contextmanager
-    def _session(self) -> Iterable[Session]:
-        with Session(self._engine) as session:
-            yield session
+    async def migrate(self) -> None:
+        """Create missing mirror tables; run once at startup, not per request."""
+        async with self._engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all, checkfirst=True)
+            await connection.run_sync(_upgrade_pad_columns)
 
     async def record_episode(self, episode: EpisodeRecord, post: MirrorState) -> None:
         reward = calculate_reward(episode.pre, post)
         dt_ms = max(0, int((post.ts - episode.pre.ts) * 1000))
-        payload = MirrorEvent(
-            ts=post.ts,
-            user_count=episode.user_count,
-            tone=episode.action.tone,
-            intensity=float(episode.action.intensity),
-            intensity_bin=episode.action.intensity_bin,
-            pre_coh=episode.pre.coherence,
-            pre_ent=episode.pre.entropy,
-            pre_pad=",".join(f"{value:.4f}" for value in episode.pre.pad),
-            post_coh=post.coherence,
-            post_ent=post.entropy,
-            post_pad=",".join(f"{value:.4f}" for value in post.pad),
-            dt_ms=dt_ms,
-            bucket_key=episode.bucket_key,
-            reward=reward,
-        )
+        payload = {
+            "ts": post.ts,
+            "user_count": episode.user_count,
+            "tone": episode.action.tone,
+            "intensity": float(episode.action.intensity),
+            "intensity_bin": episode.action.intensity_bin,
+            "pre_coh": episode.pre.coherence,
+            "pre_ent": episode.pre.entropy,
+            "pre_pad": pack_pad(*episode.pre.pad),
+            "post_coh": post.coherence,
+            "post_ent": post.entropy,
+            "post_pad": pack_pad(*post.pad),
+            "dt_ms": dt_ms,
+            "bucket_key": episode.bucket_key,
+            "reward": reward,
+        }
 
+        # Core statements on one connection; the ORM classes are only used
+        # for reads, so there is no unit of work to flush per episode.
         async with self._lock:
-            await asyncio.to_thread(self._persist_event, payload, episode.action)
-
-    def _persist_event(self, payload: MirrorEvent, action: MirrorAction) -> None:
-        with self._session() as session:
-            session.add(payload)
-            self._upsert_policy(session, payload.bucket_key, action, payload.reward)
-            session.commit()
+            async with self._engine.begin() as connection:
+                await connection.execute(_EVENTS.insert(), payload)
+                await self._upsert_policy(connection, episode.bucket_key, episode.action, reward)
 
-    def _upsert_policy(
-        self, session: Session, bucket_key: str, action: MirrorAction, reward: float
+    async def _upsert_policy(
+        self, connection: AsyncConnection, bucket_key: str, action: MirrorAction, reward: float
     ) -> None:
-        record = session.get(
-            MirrorPolicy,
-            {
-                "bucket_key": bucket_key,
-                "tone": action.tone,
-                "intensity_bin": action.intensity_bin,
-            },
-        )
         now = datetime.utcnow()
-        if record is None:
-            record = MirrorPolicy(
+        dialect = self._engine.dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            stmt = insert(_POLICIES).values(
                 bucket_key=bucket_key,
                 tone=action.tone,
                 intensity_bin=action.intensity_bin,
@@ -129,93 +216,116 @@ class MirrorRepository:
                 n=1,
                 updated_at=now,
             )
-            session.add(record)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["bucket_key", "tone", "intensity_bin"],
+                set_={
+                    "reward_avg": (_POLICIES.c.reward_avg * _POLICIES.c.n + reward) / (_POLICIES.c.n + 1),
+                    "n": _POLICIES.c.n + 1,
+                    "updated_at": now,
+                },
+            )
+            await connection.execute(stmt)
+            return
+
+        match = (
+            (_POLICIES.c.bucket_key == bucket_key)
+            & (_POLICIES.c.tone == action.tone)
+            & (_POLICIES.c.intensity_bin == action.intensity_bin)
+        )
+        record = (
+            await connection.execute(select(_POLICIES.c.reward_avg, _POLICIES.c.n).where(match))
+        ).first()
+        if record is None:
+            await connection.execute(
+                _POLICIES.insert().values(
+                    bucket_key=bucket_key,
+                    tone=action.tone,
+                    intensity_bin=action.intensity_bin,
+                    reward_avg=reward,
+                    n=1,
+                    updated_at=now,
+                )
+            )
         else:
-            total = record.reward_avg * record.n + reward
-            record.n += 1
-            record.reward_avg = total / max(record.n, 1)
-            record.updated_at = now
+            n = record.n + 1
+            await connection.execute(
+                _POLICIES.update()
+                .where(match)
+                .values(reward_avg=(record.reward_avg * record.n + reward) / n, n=n, updated_at=now)
+            )
 
     async def recalculate_policies(self) -> None:
         async with self._lock:
-            await asyncio.to_thread(self._recalculate_sync)
-
-    def _recalculate_sync(self) -> None:
-        with self._session() as session:
-            aggregates = session.execute(
-                select(
-                    MirrorEvent.bucket_key,
-                    MirrorEvent.tone,
-                    MirrorEvent.intensity_bin,
-                    func.avg(MirrorEvent.reward).label("reward_avg"),
-                    func.count(MirrorEvent.id).label("n"),
-                )
-                .group_by(MirrorEvent.bucket_key, MirrorEvent.tone, MirrorEvent.intensity_bin)
-            ).all()
-
-            seen: set[tuple[str, str, int]] = set()
-            for bucket_key, tone, intensity_bin, reward_avg, n in aggregates:
-                key = (bucket_key, tone, int(intensity_bin))
-                seen.add(key)
-                record = session.get(
-                    MirrorPolicy,
-                    {
-                        "bucket_key": bucket_key,
-                        "tone": tone,
-                        "intensity_bin": int(intensity_bin),
-                    },
-                )
-                now = datetime.utcnow()
-                if record is None:
-                    record = MirrorPolicy(
-                        bucket_key=bucket_key,
-                        tone=tone,
-                        intensity_bin=int(intensity_bin),
-                        reward_avg=float(reward_avg or 0.0),
-                        n=int(n or 0),
-                        updated_at=now,
+            async with self._session() as session:
+                aggregates = (
+                    await session.execute(
+                        select(
+                            MirrorEvent.bucket_key,
+                            MirrorEvent.tone,
+                            MirrorEvent.intensity_bin,
+                            func.avg(MirrorEvent.reward).label("reward_avg"),
+                            func.count(MirrorEvent.id).label("n"),
+                        )
+                        .group_by(MirrorEvent.bucket_key, MirrorEvent.tone, MirrorEvent.intensity_bin)
                     )
-                    session.add(record)
-                else:
-                    record.reward_avg = float(reward_avg or 0.0)
-                    record.n = int(n or 0)
-                    record.updated_at = now
-
-            session.commit()
-
-    async def get_policy_entries(self, bucket_key: str | None = None) -> List[MirrorPolicy]:
-        async with self._lock:
-            return await asyncio.to_thread(self._get_policy_sync, bucket_key)
-
-    def _get_policy_sync(self, bucket_key: str | None) -> List[MirrorPolicy]:
-        with self._session() as session:
+                ).all()
+
+                seen: set[tuple[str, str, int]] = set()
+                for bucket_key, tone, intensity_bin, reward_avg, n in aggregates:
+                    key = (bucket_key, tone, int(intensity_bin))
+                    seen.add(key)
+                    record = await session.get(
+                        MirrorPolicy,
+                        {
+                            "bucket_key": bucket_key,
+                            "tone": tone,
+                            "intensity_bin": int(intensity_bin),
+                        },
+                    )
+                    now = datetime.utcnow()
+                    if record is None:
+                        record = MirrorPolicy(
+                            bucket_key=bucket_key,
+                            tone=tone,
+                            intensity_bin=int(intensity_bin),
+                            reward_avg=float(reward_avg or 0.0),
+                            n=int(n or 0),
+                            updated_at=now,
+                        )
+                        session.add(record)
+                    else:
+                        record.reward_avg = float(reward_avg or 0.0)
+                        record.n = int(n or 0)
+                        record.updated_at = now
+
+                await session.commit()
+
+    # Readers do not take self._lock on a database file: WAL lets them run
+    # alongside the single writer, so choose_action is not held up by a
+    # recalculation.
+    async def get_policy_entries(
+        self, bucket_key: str | None = None, limit: int | None = None
+    ) -> List[MirrorPolicy]:
+        async with self._read_guard, self._session() as session:
             stmt = select(MirrorPolicy)
             if bucket_key:
                 stmt = stmt.where(MirrorPolicy.bucket_key == bucket_key)
             stmt = stmt.order_by(MirrorPolicy.reward_avg.desc())
-            result = session.execute(stmt)
-            return [row[0] for row in result]
+            if limit is not None:
+                stmt = stmt.limit(limit)
+            return list((await session.execute(stmt)).scalars())
 
     async def get_best_policy(self, bucket_key: str) -> Optional[MirrorPolicy]:
-        entries = await self.get_policy_entries(bucket_key)
+        entries = await self.get_policy_entries(bucket_key, limit=1)
         return entries[0] if entries else None
 
     async def list_recent_events(self, limit: int = 120) -> List[MirrorEvent]:
-        async with self._lock:
-            return await asyncio.to_thread(self._list_recent_events_sync, limit)
-
-    def _list_recent_events_sync(self, limit: int) -> List[MirrorEvent]:
-        with self._session() as session:
+        async with self._read_guard, self._session() as session:
             stmt = select(MirrorEvent).order_by(MirrorEvent.id.desc()).limit(limit)
-            result = session.execute(stmt)
-            return [row[0] for row in result]
+            return list((await session.execute(stmt)).scalars())
 
     async def heatmap(self) -> List[dict]:
-        async with self._lock:
-            return await asyncio.to_thread(self._heatmap_sync)
-
-    def _heatmap_sync(self) -> List[dict]:
-        with self._session() as session:
+        async with self._read_guard, self._session() as session:
             stmt = (
                 select(
                     MirrorEvent.tone,
@@ -226,7 +336,7 @@ class MirrorRepository:
                 .group_by(MirrorEvent.tone, MirrorEvent.intensity_bin)
                 .order_by(MirrorEvent.tone)
             )
-            rows = session.execute(stmt).all()
+            rows = (await session.execute(stmt)).all()
             return [
                 {
                     "tone": tone,
@@ -237,47 +347,100 @@ class MirrorRepository:
                 for tone, intensity_bin, reward, n in rows
             ]
 
-    async def stats(self) -> dict:
-        events = await self.list_recent_events(limit=500)
-        total = len(events)
-        if not total:
-            return {
-                "total_events": 0,
-                "avg_reward": 0.0,
-                "bucket_coverage": 0.0,
-                "unique_buckets": 0,
-                "recent_events": [],
-            }
+    async def heatmap_json(self) -> str:
+        """Heatmap as a JSON array, built by SQLite so it can be served as-is."""
+        if self._engine.dialect.name != "sqlite":
+            return json.dumps(await self.heatmap())
+        events = _EVENTS.c
+        cells = (
+            select(
+                events.tone,
+                func.coalesce(events.intensity_bin, 0).label("intensity_bin"),
+                func.coalesce(func.avg(events.reward), 0.0).label("reward"),
+                func.count(events.id).label("n"),
+            )
+            .group_by(events.tone, events.intensity_bin)
+            .order_by(events.tone)
+            .subquery()
+        )
+        stmt = select(
+            func.coalesce(
+                func.json_group_array(
+                    func.json_object(
+                        "tone", cells.c.tone,
+                        "intensity_bin", cells.c.intensity_bin,
+                        "reward", cells.c.reward,
+                        "count", cells.c.n,
+                    )
+                ),
+                "[]",
+            )
+        )
+        async with self._read_guard, self._engine.connect() as connection:
+            return (await connection.execute(stmt)).scalar_one()
+
+    async def stats(self, window: int = 500) -> dict:
+        events = _EVENTS.c
+        # Newest ``window`` events; aggregates and rows are read straight off
+        # the connection without building ORM objects.
+        recent = (
+            select(
+                events.id,
+                events.ts,
+                events.bucket_key,
+                events.tone,
+                events.intensity,
+                (events.post_coh - events.pre_coh).label("delta_coherence"),
+                (events.post_ent - events.pre_ent).label("delta_entropy"),
+                events.reward,
+            )
+            .order_by(events.id.desc())
+            .limit(window)
+            .subquery()
+        )
+        async with self._read_guard, self._engine.connect() as connection:
+            total, avg_reward, unique_buckets = (
+                await connection.execute(
+                    select(
+                        func.count(),
+                        func.avg(recent.c.reward),
+                        func.count(func.distinct(recent.c.bucket_key)),
+                    )
+                )
+            ).one()
+            if not total:
+                return {
+                    "total_events": 0,
+                    "avg_reward": 0.0,
+                    "bucket_coverage": 0.0,
+                    "unique_buckets": 0,
+                    "recent_events": [],
+                }
+            rows = (await connection.execute(select(recent).order_by(recent.c.id.desc()))).mappings().all()
 
-        rewards = [event.reward for event in events]
-        unique_buckets = {event.bucket_key for event in events}
-        coverage = len(unique_buckets) / 72.0
         return {
             "total_events": total,
-            "avg_reward": sum(rewards) / total,
-            "bucket_coverage": coverage,
-            "unique_buckets": len(unique_buckets),
-            "recent_events": [
-                {
-                    "id": event.id,
-                    "ts": event.ts,
-                    "bucket_key": event.bucket_key,
-                    "tone": event.tone,
-                    "intensity": event.intensity,
-                    "delta_coherence": event.post_coh - event.pre_coh,
-                    "delta_entropy": event.post_ent - event.pre_ent,
-                    "reward": event.reward,
-                }
-                for event in events
-            ],
+            "avg_reward": float(avg_reward),
+            "bucket_coverage": unique_buckets / 72.0,
+            "unique_buckets": unique_buckets,
+            "recent_events": [dict(row) for row in rows],
         }
 
 
 _mirror_repository: MirrorRepository | None = None
 
 
-def get_repository() -> MirrorRepository:
+async def init_repository(url: str | None = None) -> MirrorRepository:
+    """Build and migrate the shared repository; called from app startup."""
     global _mirror_repository
     if _mirror_repository is None:
-        _mirror_repository = MirrorRepository()
+        repository = MirrorRepository(url)
+        await repository.migrate()
+        _mirror_repository = repository
+    return _mirror_repository
+
+
+def get_repository() -> MirrorRepository:
+    if _mirror_repository is None:
+        raise RuntimeError("mirror repository not initialised; call init_repository() at startup")
     return _mirror_repository
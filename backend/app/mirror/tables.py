@@ -13,7 +13,14 @@ from sqlalchemy import (
     String,
     Table,
     Text,
+    bindparam,
+    column,
+    inspect,
+    select,
+    table,
+    text,
 )
+from sqlalchemy.engine import Connection
 
 metadata = MetaData()
 
@@ -31,8 +38,13 @@ mirror_events = Table(
     Column("pre_ent", Float, nullable=False),
     Column("post_coh", Float, nullable=False),
     Column("post_ent", Float, nullable=False),
-    Column("pre_pad", JSON, nullable=False),
-    Column("post_pad", JSON, nullable=False),
+    # PAD vectors as one column per axis (pleasure, arousal, dominance).
+    Column("pre_pad_p", Float, nullable=False),
+    Column("pre_pad_a", Float, nullable=False),
+    Column("pre_pad_d", Float, nullable=False),
+    Column("post_pad_p", Float, nullable=False),
+    Column("post_pad_a", Float, nullable=False),
+    Column("post_pad_d", Float, nullable=False),
     Column("dt_ms", Integer, nullable=False),
     Column("bucket_key", String(32), nullable=False),
     Column("cause_text", Text, nullable=True),
@@ -59,4 +71,45 @@ causal_summary = Table(
 
 Index("idx_mirror_ts", mirror_events.c.ts)
 Index("idx_mirror_bucket", mirror_events.c.bucket_key)
+Index("idx_mirror_bucket_ts", mirror_events.c.bucket_key, mirror_events.c.ts)
 Index("idx_policy_bucket", policy_table.c.bucket_key)
+# Best entry of a bucket: WHERE bucket_key = ? ORDER BY reward_avg DESC LIMIT 1
+Index("idx_policy_bucket_reward", policy_table.c.bucket_key, policy_table.c.reward_avg)
+
+
+_PAD_COLUMNS = {
+    prefix: tuple(f"{prefix}_{axis}" for axis in "pad") for prefix in ("pre_pad", "post_pad")
+}
+
+
+def pad_values(pad) -> tuple[float, float, float]:
+    """Three PAD floats from a stored or incoming vector; missing axes are 0.0."""
+    values = tuple(float(v) for v in (pad or ())[:3])
+    return values + (0.0,) * (3 - len(values))
+
+
+def upgrade_schema(connection: Connection) -> None:
+    """Split PAD vectors stored by older versions as JSON into float columns."""
+    existing = {col["name"] for col in inspect(connection).get_columns(mirror_events.name)}
+    if "pre_pad" not in existing:
+        return
+    for names in _PAD_COLUMNS.values():
+        for name in names:
+            if name not in existing:
+                connection.execute(
+                    text(f"ALTER TABLE {mirror_events.name} ADD COLUMN {name} FLOAT NOT NULL DEFAULT 0")
+                )
+    legacy = table(mirror_events.name, column("id"), column("pre_pad", JSON), column("post_pad", JSON))
+    params = []
+    for row in connection.execute(select(legacy.c.id, legacy.c.pre_pad, legacy.c.post_pad)):
+        values = {"b_id": row.id}
+        for prefix, names in _PAD_COLUMNS.items():
+            values.update(zip(names, pad_values(getattr(row, prefix))))
+        params.append(values)
+    if params:
+        connection.execute(
+            mirror_events.update().where(mirror_events.c.id == bindparam("b_id")),
+            params,
+        )
+    for prefix in _PAD_COLUMNS:
+        connection.execute(text(f"ALTER TABLE {mirror_events.name} DROP COLUMN {prefix}"))
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from typing import Iterable, Sequence
+from typing import Iterable, NamedTuple, Sequence
 
 
-@dataclass(slots=True)
-class MirrorEpisode:
+# Episodes are never modified after they are built, so a tuple is enough.
+class MirrorEpisode(NamedTuple):
     ts: datetime
     user_count: int
     tone: str
@@ -43,25 +44,102 @@ def intensity_to_bin(value: float) -> int:
     return int(round(clamp(value) * 10))
 
 
+# intensity_to_bin only produces bins 0..10.
+_BIN_INTENSITIES = tuple(b / 10.0 for b in range(11))
+
+
 def bin_to_intensity(value: int) -> float:
+    if 0 <= value <= 10:
+        return _BIN_INTENSITIES[value]
     return clamp(value / 10.0)
 
 
+def reward_from(pre_coh: float, pre_ent: float, post_coh: float, post_ent: float) -> float:
+    return (post_coh - pre_coh) - (post_ent - pre_ent)
+
+
 def compute_reward(pre: dict[str, float], post: dict[str, float]) -> float:
-    return (post["coherence"] - pre["coherence"]) - (post["entropy"] - pre["entropy"])
+    return reward_from(pre["coherence"], pre["entropy"], post["coherence"], post["entropy"])
+
+
+def _dominant_index(pad: Sequence[float] | None) -> int:
+    # Same comparisons max() makes, so the first maximum wins.
+    size = len(pad) if pad else 0
+    if size < 2:
+        return 0
+    dominant = 1 if pad[1] > pad[0] else 0
+    if size > 2 and pad[2] > pad[dominant]:
+        dominant = 2
+    return dominant
 
 
 def dominant_pad_letter(pad: Iterable[float]) -> str:
-    values = list(pad)[:3]
-    if not values:
-        return "P"
-    max_index = max(range(len(values)), key=lambda idx: values[idx])
-    return "PAD"[max_index]
+    values = pad if isinstance(pad, (list, tuple)) else list(pad)
+    return "PAD"[_dominant_index(values)]
+
+
+# Every possible key, indexed by (hour * 3 + load bin) * 3 + dominant axis.
+# Interned, so policy-cache lookups keyed by them usually hit on identity.
+_BUCKET_KEYS = tuple(
+    sys.intern(f"{hour:02d}-{load_bin}-{dominant}")
+    for hour in range(24)
+    for load_bin in "LMH"
+    for dominant in "PAD"
+)
 
 
 def build_bucket_key(ts: int, user_count: int, pad: Sequence[float]) -> str:
-    moment = datetime.fromtimestamp(ts, tz=timezone.utc)
-    hour = moment.hour
-    load_bin = "L" if user_count < 20 else "M" if user_count < 60 else "H"
-    dominant = dominant_pad_letter(pad or [0.0, 0.0, 0.0])
-    return f"{hour:02d}-{load_bin}-{dominant}"
+    # UTC hour straight from the epoch seconds; no datetime is needed.
+    hour = int(ts // 3600 % 24)
+    load = 0 if user_count < 20 else 1 if user_count < 60 else 2
+    return _BUCKET_KEYS[(hour * 3 + load) * 3 + _dominant_index(pad)]
+
+
+# Types used by the SQLite mirror store (storage.py) and MirrorManager.
+
+
+@dataclass(slots=True, frozen=True)
+class MirrorState:
+    coherence: float
+    entropy: float
+    pad: tuple[float, float, float]
+    ts: int
+
+    @classmethod
+    def from_payload(cls, payload: dict) -> MirrorState:
+        pad = tuple(float(v) for v in (payload.get("pad_avg") or payload.get("pad") or ())[:3])
+        ts = payload.get("ts")
+        return cls(
+            coherence=float(payload.get("coherence", 0.0)),
+            entropy=float(payload.get("entropy", 0.0)),
+            pad=pad + (0.0,) * (3 - len(pad)),
+            ts=int(datetime.now(timezone.utc).timestamp() if ts is None else ts),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class MirrorAction:
+    tone: str
+    intensity: float
+    message: str = ""
+
+    @property
+    def intensity_bin(self) -> int:
+        return intensity_to_bin(self.intensity)
+
+
+@dataclass(slots=True)
+class EpisodeRecord:
+    pre: MirrorState
+    action: MirrorAction
+    bucket_key: str
+    user_count: int
+    started_at: float
+
+
+def calculate_reward(pre: MirrorState, post: MirrorState) -> float:
+    return reward_from(pre.coherence, pre.entropy, post.coherence, post.entropy)
+
+
+def derive_bucket_key(moment: datetime, user_count: int, pad: Sequence[float]) -> str:
+    return build_bucket_key(int(moment.timestamp()), user_count, pad)
@@ -0,0 +1,485 @@
+from __future__ import annotations
+
+"""Mirror loop adaptive policy utilities."""
+
+import random
+import sys
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, MutableMapping, Optional, Sequence, Tuple
+
+from .config import settings
+
+_BUCKET_RATE_LIMIT_SECONDS = 2.0
+_EPSILON = 0.1
+# Upper bounds of the "low" and "medium" intensity bins.
+_LOW_INTENSITY_MAX = 0.33
+_MEDIUM_INTENSITY_MAX = 0.66
+_ZERO_PAD = (0.0, 0.0, 0.0)
+
+
+@dataclass(slots=True)
+class FieldSnapshot:
+    """Lightweight immutable state extracted from AstroLayer."""
+
+    coherence: float
+    entropy: float
+    pad: Tuple[float, float, float]
+    ts: float
+
+    @classmethod
+    def from_mapping(cls, payload: MutableMapping[str, object] | None) -> Optional["FieldSnapshot"]:
+        if not payload:
+            return None
+
+        coherence = float(payload.get("coherence", 0.0))
+        entropy = float(payload.get("entropy", 0.0))
+        pad_values = payload.get("pad_avg") or payload.get("pad") or _ZERO_PAD
+        if not isinstance(pad_values, (list, tuple)):
+            pad_values = list(pad_values)  # type: ignore[call-overload]
+        size = len(pad_values)
+        if size >= 3:
+            pad_tuple = (float(pad_values[0]), float(pad_values[1]), float(pad_values[2]))
+        else:
+            pad_tuple = (
+                float(pad_values[0]) if size > 0 else 0.0,
+                float(pad_values[1]) if size > 1 else 0.0,
+                0.0,
+            )
+        ts_raw = payload.get("ts")
+        ts = float(ts_raw) if ts_raw is not None else time.time()
+        return cls(coherence=coherence, entropy=entropy, pad=pad_tuple, ts=ts)
+
+
+@dataclass(slots=True)
+class MirrorEvent:
+    """Recorded transition between two AstroLayer snapshots."""
+
+    timestamp: datetime
+    user_count: int
+    tone: str
+    intensity: float
+    pre: FieldSnapshot
+    post: FieldSnapshot
+    dt_ms: float
+    bucket_key: str
+    reward: float
+    cause_text: str | None = None
+
+
+@dataclass(slots=True)
+class PolicyEntry:
+    """Aggregated reward statistics for a tone/intensity bin."""
+
+    bucket_key: str
+    tone: str
+    intensity_bin: str
+    reward_avg: float = 0.0
+    n: int = 0
+    avg_intensity: float = 0.0
+    updated_at: datetime | None = None
+
+    def update(self, reward: float, intensity: float, timestamp: datetime) -> None:
+        self.n += 1
+        delta_reward = reward - self.reward_avg
+        self.reward_avg += delta_reward / float(self.n)
+        delta_intensity = intensity - self.avg_intensity
+        self.avg_intensity += delta_intensity / float(self.n)
+        self.updated_at = timestamp
+
+
+def _argmax(bucket: Sequence[PolicyEntry]) -> PolicyEntry:
+    return max(bucket, key=lambda item: (item.reward_avg, item.n))
+
+
+def _intensity_bin(value: float) -> str:
+    # Plain comparisons beat a tuple lookup indexed by summed booleans in
+    # CPython; the cut-offs are not thirds, so int(value * 3) cannot be used.
+    if value < _LOW_INTENSITY_MAX:
+        return "low"
+    if value < _MEDIUM_INTENSITY_MAX:
+        return "medium"
+    return "high"
+
+
+def compute_reward(pre: FieldSnapshot, post: FieldSnapshot) -> float:
+    """Reward encourages higher coherence and lower entropy."""
+
+    delta_coherence = post.coherence - pre.coherence
+    delta_entropy = post.entropy - pre.entropy
+    return delta_coherence - delta_entropy
+
+
+# Every possible bucket key (24 hours x 3 load bins x 3 dominant axes),
+# indexed by hour * 9 + load_index * 3 + dominant_index.
+_BUCKET_KEYS = tuple(
+    sys.intern(f"{hour:02d}-{load_bin}-{dominant}")
+    for hour in range(24)
+    for load_bin in "LMH"
+    for dominant in "PAD"
+)
+
+
+def compute_bucket_key(timestamp: datetime, load: int, pad: Sequence[float]) -> str:
+    if load < 20:
+        index = timestamp.hour * 9
+    elif load < 60:
+        index = timestamp.hour * 9 + 3
+    else:
+        index = timestamp.hour * 9 + 6
+
+    # First maximum wins on ties, as max() over the indices would. Two
+    # comparisons are cheaper than any last-pad cache check, and pads that
+    # round to the same grid cell can still differ in their dominant axis.
+    size = len(pad)
+    if size > 1:
+        dominant = 1 if pad[1] > pad[0] else 0
+        if size > 2 and pad[2] > pad[dominant]:
+            dominant = 2
+        index += dominant
+
+    return _BUCKET_KEYS[index]
+
+
+class MirrorLoop:
+    """Stores mirror events and maintains an adaptive policy."""
+
+    def __init__(
+        self,
+        *,
+        epsilon: float = _EPSILON,
+        rate_limit: float = _BUCKET_RATE_LIMIT_SECONDS,
+        max_events: int | None = None,
+    ) -> None:
+        self._events: List[MirrorEvent] = []
+        # The oldest events are dropped once the log passes max_events; the
+        # lists are trimmed in chunks of max_events // 8 to keep it amortized.
+        self._max_events = max_events or settings.mirror_event_cap
+        self._trim_at = self._max_events + max(1, self._max_events // 8)
+        # Column-wise copies of the per-event scalars aggregated by get_stats().
+        self._timestamps: List[datetime] = []
+        self._rewards: List[float] = []
+        self._delta_coherence: List[float] = []
+        self._delta_entropy: List[float] = []
+        # While events arrive in timestamp order a time window is a bisect.
+        self._ordered = True
+        # Flat (bucket_key, tone, intensity_bin) -> entry table, plus a
+        # per-bucket index for choose_action()/get_policy().
+        self._policy: Dict[Tuple[str, str, str], PolicyEntry] = {}
+        self._buckets: Dict[str, List[PolicyEntry]] = {}
+        # Current argmax of each bucket, as choose_action() would pick it.
+        self._best: Dict[str, PolicyEntry] = {}
+        # Full get_policy() ordering, kept until the policy changes again.
+        self._policy_sorted: List[PolicyEntry] | None = None
+        self._last_logged_at: Dict[str, datetime] = {}
+        self._epsilon = epsilon
+        # Compared against datetime differences directly; converting naive
+        # datetimes with .timestamp() goes through local-time calendar math.
+        self._rate_window = timedelta(seconds=rate_limit)
+
+    # --- logging -----------------------------------------------------------------
+    def log_event(
+        self,
+        *,
+        pre_state: MutableMapping[str, object] | None,
+        action: MutableMapping[str, object] | None,
+        post_state: MutableMapping[str, object] | None,
+        user_count: int,
+        timestamp: datetime | None = None,
+    ) -> Optional[MirrorEvent]:
+        pre_snapshot = FieldSnapshot.from_mapping(pre_state)
+        post_snapshot = FieldSnapshot.from_mapping(post_state)
+        if not pre_snapshot or not post_snapshot or not action:
+            return None
+
+        # Tones repeat across events; interning shares one copy and lets the
+        # policy table compare keys by identity (bucket keys are pre-interned).
+        tone = sys.intern(str(action.get("tone", "neutral")))
+        intensity = float(action.get("intensity", 0.5))
+        cause_candidate = action.get("hint") if isinstance(action, MutableMapping) else None
+        cause_text = str(cause_candidate) if isinstance(cause_candidate, str) and cause_candidate else None
+        if not cause_text and isinstance(action, MutableMapping):
+            hint_meta = action.get("hint_meta")
+            if isinstance(hint_meta, MutableMapping):
+                raw = hint_meta.get("cause")
+                if isinstance(raw, str) and raw:
+                    cause_text = raw
+        ts = timestamp or datetime.utcnow()
+        dt_ms = max(0.0, (post_snapshot.ts - pre_snapshot.ts) * 1000.0)
+        bucket_key = compute_bucket_key(ts, user_count, pre_snapshot.pad)
+
+        last_logged = self._last_logged_at.get(bucket_key)
+        if last_logged is not None and ts - last_logged < self._rate_window:
+            return None
+
+        reward = compute_reward(pre_snapshot, post_snapshot)
+        event = MirrorEvent(
+            timestamp=ts,
+            user_count=user_count,
+            tone=tone,
+            intensity=intensity,
+            pre=pre_snapshot,
+            post=post_snapshot,
+            dt_ms=dt_ms,
+            bucket_key=bucket_key,
+            reward=reward,
+            cause_text=cause_text,
+        )
+        self._record(event)
+        self._last_logged_at[bucket_key] = ts
+        self._update_policy(event)
+        return event
+
+    def _record(self, event: MirrorEvent) -> None:
+        timestamps = self._timestamps
+        if timestamps and event.timestamp < timestamps[-1]:
+            self._ordered = False
+        self._events.append(event)
+        timestamps.append(event.timestamp)
+        self._rewards.append(event.reward)
+        self._delta_coherence.append(event.post.coherence - event.pre.coherence)
+        self._delta_entropy.append(event.post.entropy - event.pre.entropy)
+        if len(self._events) > self._trim_at:
+            excess = len(self._events) - self._max_events
+            del self._events[:excess]
+            del timestamps[:excess]
+            del self._rewards[:excess]
+            del self._delta_coherence[:excess]
+            del self._delta_entropy[:excess]
+
+    def _update_policy(self, event: MirrorEvent) -> None:
+        bin_name = _intensity_bin(event.intensity)
+        key = (event.bucket_key, event.tone, bin_name)
+        entry = self._policy.get(key)
+        if entry is None:
+            entry = PolicyEntry(
+                bucket_key=event.bucket_key,
+                tone=event.tone,
+                intensity_bin=bin_name,
+            )
+            self._policy[key] = entry
+            self._buckets.setdefault(event.bucket_key, []).append(entry)
+        previous_avg = entry.reward_avg
+        entry.update(event.reward, event.intensity, event.timestamp)
+        self._policy_sorted = None
+
+        bucket_key = event.bucket_key
+        best = self._best.get(bucket_key)
+        if best is None:
+            self._best[bucket_key] = entry
+        elif best is entry:
+            # n always grows, so the leader only loses its place when its
+            # average drops.
+            if entry.reward_avg < previous_avg:
+                self._best[bucket_key] = _argmax(self._buckets[bucket_key])
+        else:
+            rank = (entry.reward_avg, entry.n)
+            best_rank = (best.reward_avg, best.n)
+            if rank > best_rank:
+                self._best[bucket_key] = entry
+            elif rank == best_rank:
+                # Exact ties go to the entry created first, like max().
+                self._best[bucket_key] = _argmax(self._buckets[bucket_key])
+
+    # --- policy ------------------------------------------------------------------
+    def choose_action(
+        self,
+        *,
+        bucket_key: str,
+        fallback_tone: str,
+        fallback_intensity: float,
+    ) -> Tuple[str, float]:
+        if not bucket_key:
+            return fallback_tone, fallback_intensity
+
+        if random.random() < self._epsilon:
+            return fallback_tone, fallback_intensity
+
+        # Entry with highest reward_avg (ties broken by sample size)
+        best_entry = self._best.get(bucket_key)
+        if best_entry is None:
+            return fallback_tone, fallback_intensity
+
+        chosen_intensity = min(1.0, max(0.0, best_entry.avg_intensity or fallback_intensity))
+        return best_entry.tone, chosen_intensity
+
+    # --- inspection --------------------------------------------------------------
+    def rebuild_policy(self) -> None:
+        self._policy.clear()
+        self._buckets.clear()
+        self._best.clear()
+        self._policy_sorted = None
+        self._last_logged_at.clear()
+        # The event log and its columns are unchanged; only the policy is
+        # recomputed from it.
+        for event in self._events:
+            self._update_policy(event)
+            self._last_logged_at[event.bucket_key] = event.timestamp
+
+    def get_policy(self, bucket_key: str | None = None) -> List[PolicyEntry]:
+        if bucket_key:
+            bucket = self._buckets.get(bucket_key, [])
+            return sorted(bucket, key=lambda entry: entry.reward_avg, reverse=True)
+
+        if self._policy_sorted is None:
+            self._policy_sorted = sorted(
+                self._policy.values(), key=lambda entry: (entry.bucket_key, -entry.reward_avg)
+            )
+        return list(self._policy_sorted)
+
+    def get_stats(
+        self,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Dict[str, object]:
+        return self._summarize(*self._select(start, end), include_events=True)
+
+    def get_summary(
+        self,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> Dict[str, object]:
+        """Same as get_stats() with an empty ``events`` list."""
+        return self._summarize(*self._select(start, end), include_events=False)
+
+    def _select(
+        self, start: datetime | None, end: datetime | None
+    ) -> Tuple[List[MirrorEvent], List[float], List[float], List[float]]:
+        events = self._events
+        rewards = self._rewards
+        delta_coherence = self._delta_coherence
+        delta_entropy = self._delta_entropy
+        if start or end:
+            timestamps = self._timestamps
+            if self._ordered:
+                lo = bisect_left(timestamps, start) if start is not None else 0
+                hi = bisect_right(timestamps, end) if end is not None else len(timestamps)
+                events = events[lo:hi]
+                rewards = rewards[lo:hi]
+                delta_coherence = delta_coherence[lo:hi]
+                delta_entropy = delta_entropy[lo:hi]
+            else:
+                selected = [
+                    index
+                    for index, ts in enumerate(timestamps)
+                    if (start is None or ts >= start) and (end is None or ts <= end)
+                ]
+                events = [events[index] for index in selected]
+                rewards = [rewards[index] for index in selected]
+                delta_coherence = [delta_coherence[index] for index in selected]
+                delta_entropy = [delta_entropy[index] for index in selected]
+        return events, rewards, delta_coherence, delta_entropy
+
+    @staticmethod
+    def _event_rows(
+        events: List[MirrorEvent], delta_coherence: List[float], delta_entropy: List[float]
+    ) -> List[Dict[str, object]]:
+        return [
+            {
+                "timestamp": event.timestamp.isoformat(),
+                "bucket_key": event.bucket_key,
+                "delta_coherence": delta_coh,
+                "delta_entropy": delta_ent,
+                "reward": event.reward,
+                "tone": event.tone,
+                "intensity": event.intensity,
+                "cause_text": event.cause_text,
+            }
+            for event, delta_coh, delta_ent in zip(events, delta_coherence, delta_entropy)
+        ]
+
+    def _summarize(
+        self,
+        events: List[MirrorEvent],
+        rewards: List[float],
+        delta_coherence: List[float],
+        delta_entropy: List[float],
+        *,
+        include_events: bool,
+    ) -> Dict[str, object]:
+        if not events:
+            return {
+                "count": 0,
+                "avg_reward": 0.0,
+                "avg_delta_coherence": 0.0,
+                "avg_delta_entropy": 0.0,
+                "coverage": 0.0,
+                "buckets": [],
+                "events": [],
+                "causal_summary": [],
+                "hint_metrics": [],
+            }
+
+        count = len(events)
+        avg_reward = sum(rewards) / count
+        avg_delta_coherence = sum(delta_coherence) / count
+        avg_delta_entropy = sum(delta_entropy) / count
+        buckets = sorted({event.bucket_key for event in events})
+
+        bucket_hint_counts: dict[str, Counter[str]] = defaultdict(Counter)
+        hint_accumulator: dict[str, dict[str, float]] = {}
+
+        for event, delta_coh, delta_ent in zip(events, delta_coherence, delta_entropy):
+            if not event.cause_text:
+                continue
+            bucket_hint_counts[event.bucket_key][event.cause_text] += 1
+            metrics = hint_accumulator.setdefault(
+                event.cause_text,
+                {"delta_coh": 0.0, "delta_ent": 0.0, "count": 0.0},
+            )
+            metrics["delta_coh"] += delta_coh
+            metrics["delta_ent"] += delta_ent
+            metrics["count"] += 1
+
+        causal_summary = []
+        for bucket, counter in bucket_hint_counts.items():
+            for hint, hint_count in counter.most_common(3):
+                causal_summary.append(
+                    {"bucket_key": bucket, "hint": hint, "count": int(hint_count)}
+                )
+
+        hint_metrics = []
+        for hint, metrics in hint_accumulator.items():
+            count_metric = metrics["count"]
+            if count_metric <= 0:
+                continue
+            hint_metrics.append(
+                {
+                    "hint": hint,
+                    "avg_delta_coherence": metrics["delta_coh"] / count_metric,
+                    "avg_delta_entropy": metrics["delta_ent"] / count_metric,
+                    "count": int(count_metric),
+                }
+            )
+
+        hint_metrics.sort(key=lambda item: item["count"], reverse=True)
+
+        return {
+            "count": count,
+            "avg_reward": avg_reward,
+            "avg_delta_coherence": avg_delta_coherence,
+            "avg_delta_entropy": avg_delta_entropy,
+            "coverage": len(buckets) / max(1, len(self._buckets)) if self._buckets else 1.0,
+            "buckets": buckets,
+            "events": self._event_rows(events, delta_coherence, delta_entropy) if include_events else [],
+            "causal_summary": causal_summary,
+            "hint_metrics": hint_metrics,
+        }
+
+
+mirror_loop = MirrorLoop()
+
+__all__ = [
+    "FieldSnapshot",
+    "MirrorEvent",
+    "PolicyEntry",
+    "MirrorLoop",
+    "compute_bucket_key",
+    "compute_reward",
+    "mirror_loop",
+]
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Dict, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 from .node import Node
 from .user import User
@@ -19,8 +19,8 @@ class Profile(BaseModel):
     feedback_enabled: bool = True
     mirror_enabled: bool = True
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "id": "user-001",
                 "name": "Liminal Explorer",
@@ -33,6 +33,7 @@ class Profile(BaseModel):
                 "mirror_enabled": True,
             }
         }
+    )
 
 
 class ProfileSummary(BaseModel):
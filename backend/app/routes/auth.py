@@ -116,12 +116,11 @@ async def get_device_info(user: dict = Depends(auth_dependency)) -> DeviceInfoRe
 
     # Calculate resonance with other user's devices
     user_devices = device_memory.get_user_devices(device_profile.user_id)
-    resonance_map = {}
-
-    for other_device in user_devices:
-        if other_device.device_id != device_id:
-            resonance = device_memory.calculate_resonance(device_id, other_device.device_id)
-            resonance_map[other_device.device_id] = round(resonance, 3)
+    resonances = device_memory.calculate_resonance_many(
+        device_id,
+        [other.device_id for other in user_devices if other.device_id != device_id],
+    )
+    resonance_map = {other_id: round(value, 3) for other_id, value in resonances.items()}
 
     return DeviceInfoResponse(
         device_id=device_profile.device_id,
@@ -1,12 +1,14 @@
 """Emotions API routes."""
 from __future__ import annotations
 
+import heapq
+from operator import itemgetter
 from typing import Dict, List
 
 from fastapi import APIRouter
 from pydantic import BaseModel
 
-from ..astro import _PAD_LABELS
+from ..astro_labels import PAD_LABELS
 
 router = APIRouter()
 
@@ -46,17 +48,11 @@ def categorize_emotion(pad: List[float]) -> str:
         return "neutral"
 
 
-@router.get("/emotions", response_model=EmotionsResponse)
-def list_emotions() -> EmotionsResponse:
-    """Get all available emotions with PAD values.
-
-    Returns:
-        List of emotions with metadata
-    """
+def _build_catalog() -> EmotionsResponse:
     emotions: List[EmotionInfo] = []
     categories_count: Dict[str, int] = {"positive": 0, "negative": 0, "neutral": 0}
 
-    for name, pad in _PAD_LABELS.items():
+    for name, pad in PAD_LABELS.items():
         category = categorize_emotion(pad)
         emotions.append(
             EmotionInfo(
@@ -77,6 +73,21 @@ def list_emotions() -> EmotionsResponse:
     )
 
 
+# PAD_LABELS is static, so the catalog is built once at import.
+_EMOTIONS_CACHE = _build_catalog()
+_EMOTION_BY_NAME: Dict[str, EmotionInfo] = {info.name: info for info in _EMOTIONS_CACHE.emotions}
+
+
+@router.get("/emotions", response_model=EmotionsResponse)
+def list_emotions() -> EmotionsResponse:
+    """Get all available emotions with PAD values.
+
+    Returns:
+        List of emotions with metadata
+    """
+    return _EMOTIONS_CACHE
+
+
 @router.get("/emotions/{emotion_name}")
 def get_emotion(emotion_name: str) -> EmotionInfo:
     """Get specific emotion by name.
@@ -93,19 +104,15 @@ def get_emotion(emotion_name: str) -> EmotionInfo:
     from fastapi import HTTPException, status
 
     emotion_name_lower = emotion_name.strip().lower()
-    pad = _PAD_LABELS.get(emotion_name_lower)
+    info = _EMOTION_BY_NAME.get(emotion_name_lower)
 
-    if not pad:
+    if info is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Emotion '{emotion_name}' not found",
         )
 
-    return EmotionInfo(
-        name=emotion_name_lower,
-        pad=pad,
-        category=categorize_emotion(pad),
-    )
+    return info
 
 
 @router.get("/emotions/suggest/{query}")
@@ -120,19 +127,12 @@ def suggest_emotions(query: str, limit: int = 5) -> List[EmotionInfo]:
         List of matching emotions
     """
     query_lower = query.strip().lower()
-    suggestions: List[EmotionInfo] = []
-
-    for name, pad in _PAD_LABELS.items():
-        if query_lower in name:
-            suggestions.append(
-                EmotionInfo(
-                    name=name,
-                    pad=pad,
-                    category=categorize_emotion(pad),
-                )
-            )
-
-    # Sort by relevance (exact match first, then by name length)
-    suggestions.sort(key=lambda e: (e.name != query_lower, len(e.name)))
-
-    return suggestions[:limit]
+    # Rank: exact match first, then by name length; computed once per match.
+    matches = [((name != query_lower, len(name)), name) for name in PAD_LABELS if query_lower in name]
+    rank = itemgetter(0)
+    if limit >= 0:
+        top = heapq.nsmallest(limit, matches, key=rank)
+    else:  # keep the slice meaning of a negative limit
+        top = sorted(matches, key=rank)[:limit]
+
+    return [_EMOTION_BY_NAME[name] for _, name in top]
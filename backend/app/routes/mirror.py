@@ -3,7 +3,8 @@ from __future__ import annotations
 from datetime import datetime
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel
 
 from ..mirror import PolicyEntry, mirror_loop
@@ -88,25 +89,19 @@ def get_mirror_policy(
 def get_mirror_stats(
     from_ts: str | None = Query(default=None, alias="from"),
     to_ts: str | None = Query(default=None, alias="to"),
+    include_events: bool = Query(default=True, alias="events", description="Include per-event rows"),
     _: str | None = Depends(get_current_user_optional),
-) -> MirrorStatsResponse:
+) -> Response:
     start = _parse_iso(from_ts)
     end = _parse_iso(to_ts)
-    stats = mirror_loop.get_stats(start=start, end=end)
-    events = [MirrorEventModel(**event) for event in stats["events"]]
-    causal_summary = [CausalSummaryModel(**entry) for entry in stats.get("causal_summary", [])]
-    hint_metrics = [HintMetricModel(**entry) for entry in stats.get("hint_metrics", [])]
-    return MirrorStatsResponse(
-        count=stats["count"],
-        avg_reward=stats["avg_reward"],
-        avg_delta_coherence=stats["avg_delta_coherence"],
-        avg_delta_entropy=stats["avg_delta_entropy"],
-        coverage=stats["coverage"],
-        buckets=list(stats["buckets"]),
-        events=events,
-        causal_summary=causal_summary,
-        hint_metrics=hint_metrics,
-    )
+    # get_stats() already returns exactly the MirrorStatsResponse shape, so
+    # the rows are serialized directly instead of being re-validated one
+    # pydantic model per event.
+    if include_events:
+        stats = mirror_loop.get_stats(start=start, end=end)
+    else:
+        stats = mirror_loop.get_summary(start=start, end=end)
+    return Response(orjson.dumps(stats), media_type="application/json")
 
 
 @router.post("/mirror/replay", status_code=status.HTTP_202_ACCEPTED)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 
+from ..feedback import feedback_hub
 from ..models.profile import Profile
 from ..services.auth import get_current_user_optional
 from ..services.preferences import (
@@ -98,6 +99,7 @@ def update_profile_settings(
 
     if payload.feedback_enabled is not None:
         set_feedback_enabled(profile_id, payload.feedback_enabled)
+        feedback_hub.invalidate_preferences(profile_id)
     if payload.mirror_enabled is not None:
         set_mirror_enabled(profile_id, payload.mirror_enabled)
     return _build_profile(profile_id)
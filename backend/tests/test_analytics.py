@@ -39,3 +39,49 @@ def test_statistics_empty_history_returns_zero_span():
     body = stats.json()
     assert body['count'] == 0
     assert body['time_span_seconds'] == 0.0
+
+
+def test_statistics_totals_follow_evictions():
+    from app.analytics import AnalyticsHistory
+
+    history = AnalyticsHistory(max_snapshots=3)
+    for index in range(5):
+        history.add_snapshot(
+            [0.1 * index, 0.2, 0.3],
+            entropy=0.1 * index,
+            coherence=0.5,
+            samples=index,
+            tone='warm' if index % 2 else 'cool',
+        )
+
+    stats = history.get_statistics()
+
+    assert stats['count'] == 3
+    assert stats['avg_entropy'] == 0.3
+    assert stats['avg_pad'] == [0.3, 0.2, 0.3]
+    assert stats['tone_distribution'] == {'cool': 2 / 3, 'warm': 1 / 3}
+
+
+def test_tone_distribution_keeps_first_appearance_order():
+    from app.analytics import AnalyticsHistory
+
+    history = AnalyticsHistory(max_snapshots=10)
+    for tone in ('neutral', 'warm', 'neutral', 'cool'):
+        history.add_snapshot([0.5, 0.5, 0.5], entropy=0.5, coherence=0.5, samples=1, tone=tone)
+
+    assert list(history.get_statistics()['tone_distribution']) == ['neutral', 'warm', 'cool']
+    assert list(history.get_statistics(window_seconds=3600)['tone_distribution']) == ['neutral', 'warm', 'cool']
+
+
+def test_non_finite_values_do_not_poison_totals():
+    from app.analytics import AnalyticsHistory
+
+    history = AnalyticsHistory(max_snapshots=2)
+    history.add_snapshot([float('nan'), 0.2, 0.3], entropy=float('inf'), coherence=0.5, samples=1)
+    for _ in range(2):
+        history.add_snapshot([0.4, 0.2, 0.3], entropy=0.1, coherence=0.5, samples=1)
+
+    stats = history.get_statistics()
+
+    assert stats['avg_entropy'] == 0.1
+    assert stats['avg_pad'] == [0.4, 0.2, 0.3]
@@ -0,0 +1,27 @@
+import math
+
+import pytest
+
+from app.astro import clamp_pad
+
+
+@pytest.mark.parametrize(
+    "values, expected",
+    [
+        ([0.2, -0.5, 1.5], [0.2, 0.0, 1.0]),
+        ((0.1, 0.2, 0.3, 0.9), [0.1, 0.2, 0.3]),
+        (iter([0.4, 2.0]), [0.4, 1.0, 0.0]),
+        ([], [0.0, 0.0, 0.0]),
+    ],
+)
+def test_clamp_pad_bounds_and_pads(values, expected):
+    assert clamp_pad(values) == expected
+
+
+@pytest.mark.parametrize("values", [[math.nan, 0.5, 0.5], [math.nan, math.nan], [math.inf, -math.inf, math.nan]])
+def test_clamp_pad_keeps_nan_in_range(values):
+    expected = [max(0.0, min(1.0, float(v))) for v in values][:3]
+    expected.extend([0.0] * (3 - len(expected)))
+    result = clamp_pad(values)
+    assert result == expected
+    assert all(0.0 <= v <= 1.0 for v in result)
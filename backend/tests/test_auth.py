@@ -20,3 +20,89 @@ def test_login_and_device_info():
     assert dev_data['user_id'] == 'user-001'
     assert 'trust_level' in dev_data
 
+
+
+import time
+
+import jwt
+import pytest
+from fastapi import HTTPException
+
+from app.auth import jwt as auth_jwt
+from app.config import settings
+
+
+def _token(secret=None, algorithm='HS256', **claims):
+    now = int(time.time())
+    payload = {'sub': 'user-001', 'type': 'access', 'iat': now, 'exp': now + 3600, **claims}
+    return jwt.encode(payload, secret or settings.jwt_secret, algorithm=algorithm)
+
+
+def _pyjwt_accepts(token):
+    try:
+        jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+    except jwt.InvalidTokenError:
+        return False
+    return True
+
+
+def _fast_path_accepts(token):
+    auth_jwt._decode_cache.clear()
+    try:
+        auth_jwt.decode_access_token(token)
+    except HTTPException as exc:
+        assert exc.status_code == 401
+        return False
+    return True
+
+
+@pytest.mark.parametrize(
+    'token',
+    [
+        _token(),
+        _token(secret='not-the-secret'),
+        _token(exp=int(time.time()) - 10),
+        _token(iat=int(time.time()) + 600),
+        _token(algorithm='HS512'),
+    ],
+    ids=['valid', 'bad-signature', 'expired', 'future-iat', 'hs512'],
+)
+def test_hs256_fast_path_matches_pyjwt(token):
+    assert auth_jwt._verify_hs256(token, time.time()) is None or _pyjwt_accepts(token)
+    assert _fast_path_accepts(token) == _pyjwt_accepts(token)
+
+
+def test_cached_token_not_served_past_exp(monkeypatch):
+    auth_jwt._decode_cache.clear()
+    now = time.time()
+    exp = int(now) + 5
+    token = _token(exp=exp)
+    auth_jwt.decode_access_token(token)
+    assert auth_jwt._decode_cache[token][0] == exp
+
+    calls = []
+    monkeypatch.setattr(auth_jwt, '_verify_hs256', lambda t, n: calls.append(n))
+    monkeypatch.setattr(auth_jwt.jwt, 'decode', lambda *a, **k: (_ for _ in ()).throw(jwt.ExpiredSignatureError()))
+    monkeypatch.setattr(auth_jwt.time, 'time', lambda: exp + 1)
+    with pytest.raises(HTTPException) as exc:
+        auth_jwt.decode_access_token(token)
+    assert exc.value.status_code == 401
+    assert calls == [exp + 1]
+    assert token not in auth_jwt._decode_cache
+
+
+def test_cached_token_reverified_after_ttl(monkeypatch):
+    auth_jwt._decode_cache.clear()
+    now = time.time()
+    token = _token()
+    auth_jwt.decode_access_token(token)
+    first_expiry = auth_jwt._decode_cache[token][0]
+    assert first_expiry <= now + auth_jwt._DECODE_CACHE_TTL + 1
+
+    calls = []
+    original = auth_jwt._verify_hs256
+    monkeypatch.setattr(auth_jwt, '_verify_hs256', lambda t, n: calls.append(n) or original(t, n))
+    monkeypatch.setattr(auth_jwt.time, 'time', lambda: now + auth_jwt._DECODE_CACHE_TTL + 1)
+    auth_jwt.decode_access_token(token)
+    assert len(calls) == 1
+    assert auth_jwt._decode_cache[token][0] > first_expiry
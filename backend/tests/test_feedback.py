@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketState
+
+import app.feedback as feedback
+from app.feedback import NeuroFeedbackHub, feedback_hub
+from app.main import app
+from app.services import preferences
+
+
+class FakeWebSocket:
+    def __init__(self, fail_with=None):
+        self.frames = []
+        self.client_state = WebSocketState.CONNECTED
+        self.application_state = WebSocketState.CONNECTED
+        self._fail_with = fail_with
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, frame):
+        if self._fail_with is not None:
+            raise self._fail_with
+        self.frames.append(frame)
+
+
+@pytest.fixture(autouse=True)
+def _preferences(monkeypatch):
+    monkeypatch.setattr(preferences, "_FEEDBACK_ENABLED", {})
+
+
+@pytest.fixture
+async def hub():
+    hub = NeuroFeedbackHub()
+    yield hub
+    for task in (hub._broadcast_task, hub._reaper_task):
+        if task is not None:
+            task.cancel()
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_send_failure_drops_only_that_socket(hub):
+    healthy = [FakeWebSocket(), FakeWebSocket()]
+    broken = FakeWebSocket(fail_with=ConnectionResetError("gone"))
+    for websocket in (healthy[0], broken, healthy[1]):
+        await hub.connect(websocket)
+
+    await hub.publish({"event": "ping"})
+
+    assert set(hub._connections) == set(healthy)
+    assert all(websocket.frames == ['{"event":"ping"}'] for websocket in healthy)
+
+
+@pytest.mark.asyncio
+async def test_reaper_removes_sockets_closed_without_disconnect(hub, monkeypatch):
+    monkeypatch.setattr(feedback, "_REAP_INTERVAL", 0)
+    stale, live = FakeWebSocket(), FakeWebSocket()
+    await hub.connect(stale)
+    await hub.connect(live)
+
+    stale.client_state = WebSocketState.DISCONNECTED
+    await _settle()
+
+    assert list(hub._connections) == [live]
+
+
+@pytest.mark.asyncio
+async def test_preference_change_invalidates_cached_opt_in(hub):
+    websocket = FakeWebSocket()
+    await hub.connect(websocket, profile_id="user-001")
+    payload = {"event": "neuro_feedback", "data": {"tone": "warm"}}
+
+    await hub._broadcast(payload, feedback_only=True)
+    preferences.set_feedback_enabled("user-001", False)
+    # Served from the cache until the preference change is announced.
+    await hub._broadcast(payload, feedback_only=True)
+    assert len(websocket.frames) == 2
+
+    hub.invalidate_preferences("user-001")
+    await hub._broadcast(payload, feedback_only=True)
+    assert len(websocket.frames) == 2
+
+
+def test_settings_route_invalidates_feedback_cache(monkeypatch):
+    monkeypatch.setitem(feedback_hub._pref_cache, "user-001", (0.0, True))
+
+    response = TestClient(app).patch("/api/profile/user-001/settings", json={"feedback_enabled": False})
+
+    assert response.status_code == 200
+    assert "user-001" not in feedback_hub._pref_cache
@@ -141,3 +141,109 @@ async def test_pad_explicit_value_overrides_auto_calculation():
     pattern, strength, tags = storage.client.sent[-1]
     # Strength should be (0.9 + 0.8) / 2 = 0.85
     assert abs(strength - 0.85) < 0.01
+
+
+class EdgeRecordingClient(DummyClient):
+    def __init__(self):
+        super().__init__()
+        self.edges = []
+        self.sets = 0
+
+    async def awaken_set(self, model):
+        if model.id == "astro/global":
+            self.sets += 1
+            self.edges = list(model.edges)
+        return await super().awaken_set(model)
+
+    async def awaken_get(self, model_id: str):
+        result = await super().awaken_get(model_id)
+        if model_id == "astro/global":
+            result["edges"] = list(self.edges)
+        return result
+
+
+@pytest.mark.asyncio
+async def test_concurrent_resonance_edges_written_once():
+    client = EdgeRecordingClient()
+    storage = LiminalDBStorage(client=client)
+    await storage.initialize()
+    sets_before = client.sets
+
+    await asyncio.gather(*(storage.create_resonance_edge("a", f"u{i}", 0.5) for i in range(5)))
+    assert client.sets - sets_before == 1
+
+    await storage.create_resonance_edge("b", "u0", 0.25)
+    targets = [(edge["from"], edge["to"]) for edge in client.edges]
+    assert targets == [("user/a", f"user/u{i}") for i in range(5)] + [("user/b", "user/u0")]
+    assert client.sets - sets_before == 2
+
+
+class BlockingEdgeClient(EdgeRecordingClient):
+    def __init__(self):
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def awaken_get(self, model_id: str):
+        if model_id == "astro/global":
+            await self.release.wait()
+        return await super().awaken_get(model_id)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_edge_flush_does_not_strand_callers():
+    client = BlockingEdgeClient()
+    storage = LiminalDBStorage(client=client)
+    await storage.initialize()
+
+    first = asyncio.create_task(storage.create_resonance_edge("a", "b", 0.5))
+    for _ in range(3):
+        await asyncio.sleep(0)
+    # Queued while the first batch is being written.
+    second = asyncio.create_task(storage.create_resonance_edge("a", "c", 0.5))
+    await asyncio.sleep(0)
+
+    storage._edge_flush.cancel()
+    await first
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(second, timeout=1)
+    assert storage._edge_flush is None
+
+    client.release.set()
+    await asyncio.wait_for(storage.create_resonance_edge("a", "d", 0.5), timeout=1)
+    assert [edge["to"] for edge in client.edges] == ["user/d"]
+
+
+class SlowAstroClient(DummyClient):
+    def __init__(self):
+        super().__init__()
+        self.pleasure = 0.1
+        self.read_started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def awaken_get(self, model_id: str):
+        result = await super().awaken_get(model_id)
+        if model_id == "astro/global":
+            # Snapshot the field now, answer later.
+            result["latent_traits"] = {"pad_p": self.pleasure}
+            self.read_started.set()
+            await self.release.wait()
+        return result
+
+
+@pytest.mark.asyncio
+async def test_read_started_before_write_is_not_cached():
+    client = SlowAstroClient()
+    storage = LiminalDBStorage(client=client)
+    await storage.initialize()
+
+    stale_read = asyncio.create_task(storage.get_astro_field_state())
+    await client.read_started.wait()
+    # The write waits for the pool's only connection, held by the read.
+    update = asyncio.create_task(storage.update_astro_field([0.9, 0.5, 0.5], entropy=0.2, coherence=0.8))
+    await asyncio.sleep(0)
+    client.pleasure = 0.9
+    client.release.set()
+
+    assert (await stale_read)["pad"][0] == 0.1
+    await update
+    assert (await storage.get_astro_field_state())["pad"][0] == 0.9
@@ -0,0 +1,162 @@
+import asyncio
+
+import cbor2
+import pytest
+
+from app.liminaldb import client as client_module
+from app.liminaldb.client import Impulse, LiminalDBClient, LiminalDBClientPool
+
+
+class FakeWebSocket:
+    """In-memory stand-in for a LiminalDB socket; replies are queued by ``reply``."""
+
+    def __init__(self, reply=None):
+        self.sent = []
+        self._incoming = asyncio.Queue()
+        self._reply = reply
+
+    async def send(self, frame):
+        message = cbor2.loads(frame)
+        self.sent.append(message)
+        if self._reply is not None:
+            answer = self._reply(message)
+            if answer is not None:
+                self.feed(cbor2.dumps(answer))
+
+    def feed(self, message):
+        self._incoming.put_nowait(message)
+
+    async def close(self):
+        self._incoming.put_nowait(None)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self._incoming.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+
+def _echo(message):
+    if "cmd" in message:
+        return {"status": "ok", "cmd": message["cmd"], "args": message.get("args")}
+    return {"status": "ok", "pattern": message["pattern"]}
+
+
+@pytest.fixture
+def sockets(monkeypatch):
+    opened = []
+
+    async def connect(url):
+        websocket = FakeWebSocket(reply=_echo)
+        opened.append(websocket)
+        return websocket
+
+    monkeypatch.setattr(client_module.websockets, "connect", connect)
+    return opened
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_get_their_own_replies(sockets):
+    client = LiminalDBClient(url="ws://fake")
+    await client.connect()
+    # An event arriving between replies must not be taken as one.
+    sockets[0].feed(cbor2.dumps({"ev": "harmony"}))
+
+    ids = [f"model-{i}" for i in range(20)]
+    replies = await asyncio.gather(*(client.awaken_get(model_id) for model_id in ids))
+
+    assert [reply["args"]["id"] for reply in replies] == ids
+    await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_malformed_frame_marks_client_disconnected(sockets):
+    client = LiminalDBClient(url="ws://fake")
+    await client.connect()
+    sockets[0]._reply = None
+    pending = asyncio.create_task(client.get_metrics())
+    await _settle()
+
+    sockets[0].feed("not json")
+    with pytest.raises(ConnectionError):
+        await pending
+    assert not client._connected
+    with pytest.raises(RuntimeError):
+        await client.get_metrics()
+
+
+@pytest.mark.asyncio
+async def test_timed_out_request_keeps_reply_order(sockets):
+    client = LiminalDBClient(url="ws://fake")
+    client._request_timeout = 0.05
+    await client.connect()
+    websocket = sockets[0]
+    websocket._reply = None
+
+    with pytest.raises(asyncio.TimeoutError):
+        await client.awaken_get("slow")
+
+    second = asyncio.create_task(client.awaken_get("next"))
+    await _settle()
+    websocket.feed(cbor2.dumps({"id": "slow"}))
+    websocket.feed(cbor2.dumps({"id": "next"}))
+    assert (await second)["id"] == "next"
+    await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_impulse_burst_flushes_on_next_tick(sockets):
+    client = LiminalDBClient(url="ws://fake")
+    await client.connect()
+    websocket = sockets[0]
+
+    for i in range(5):
+        await client.write(f"pattern/{i}")
+    assert websocket.sent == []
+
+    await _settle()
+    assert [frame["pattern"] for frame in websocket.sent] == [f"pattern/{i}" for i in range(5)]
+    await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_command_flushes_buffered_impulses_first(sockets):
+    client = LiminalDBClient(url="ws://fake")
+    await client.connect()
+
+    await client.send_impulse(Impulse(kind="Write", pattern="before", strength=0.5))
+    reply = await client.awaken_get("model-1")
+
+    assert [frame.get("pattern", frame.get("cmd")) for frame in sockets[0].sent] == ["before", "awaken.get"]
+    assert reply["args"] == {"id": "model-1"}
+    await client.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_pool_blocks_at_max_size_until_release(sockets):
+    pool = LiminalDBClientPool(LiminalDBClient(url="ws://fake"), min_size=1, max_size=2)
+    await pool.init()
+
+    async with pool.acquire() as first, pool.acquire() as second:
+        assert first is not second
+        assert len(sockets) == 2
+
+        async def third():
+            async with pool.acquire() as client:
+                return client
+
+        waiter = asyncio.create_task(third())
+        await _settle()
+        assert not waiter.done()
+
+    assert await asyncio.wait_for(waiter, timeout=1) in (first, second)
+    assert len(sockets) == 2
+    await pool.close()
@@ -0,0 +1,19 @@
+import dataclasses
+
+from fastapi.testclient import TestClient
+
+import app.main as main_module
+from app.main import app
+from app.mirror import manager as manager_module
+from app.mirror import storage as storage_module
+
+
+def test_startup_builds_mirror_manager(tmp_path, monkeypatch):
+    monkeypatch.setattr(main_module, "settings", dataclasses.replace(main_module.settings, liminaldb_enabled=False))
+    monkeypatch.setattr(storage_module, "_DEFAULT_URL", f"sqlite:///{tmp_path / 'mirror.db'}")
+    monkeypatch.setattr(storage_module, "_mirror_repository", None)
+    monkeypatch.setattr(manager_module, "_mirror_manager", None)
+
+    with TestClient(app):
+        assert manager_module.get_mirror_manager() is app.state.mirror_manager
+        assert (tmp_path / "mirror.db").exists()
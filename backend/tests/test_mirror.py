@@ -64,3 +64,65 @@ def test_choose_action_uses_best_known_policy():
 
     assert tone == "warm"
     assert intensity == pytest.approx(event_two.intensity)
+
+
+def test_stats_route_can_skip_event_rows(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+    from app.routes import mirror as mirror_routes
+
+    loop = MirrorLoop(epsilon=0.0, rate_limit=0.0)
+    state = {"coherence": 0.4, "entropy": 0.6, "pad_avg": [0.8, 0.1, 0.1], "ts": 0.0}
+    loop.log_event(
+        pre_state=state,
+        action={"tone": "warm", "intensity": 0.8},
+        post_state={**state, "coherence": 0.6, "ts": 1.0},
+        user_count=3,
+        timestamp=datetime(2024, 1, 1, 10, 0, 0),
+    )
+    monkeypatch.setattr(mirror_routes, "mirror_loop", loop)
+    client = TestClient(app)
+
+    full = client.get("/api/mirror/stats").json()
+    summary = client.get("/api/mirror/stats?events=false").json()
+
+    assert len(full["events"]) == 1
+    assert summary["events"] == []
+    assert {**full, "events": []} == summary
+
+
+class _FailingRepository:
+    def __init__(self):
+        self.attempts = 0
+
+    async def rebuild_policy(self):
+        self.attempts += 1
+        raise RuntimeError("database is locked")
+
+
+@pytest.mark.asyncio
+async def test_failed_rebuild_backs_off(monkeypatch):
+    from app.mirror import learner as learner_module
+
+    now = [1000.0]
+    monkeypatch.setattr(learner_module.time, "monotonic", lambda: now[0])
+    repository = _FailingRepository()
+    learner = learner_module.MirrorPolicyLearner(repository)
+    learner._retry_delay = learner._delay = 60.0
+    learner._max_retry_delay = 100.0
+
+    assert not await learner.trigger_rebuild()
+    assert not await learner.trigger_rebuild()
+    assert repository.attempts == 1
+
+    now[0] += 60.0
+    await learner.trigger_rebuild()
+    assert repository.attempts == 2
+    # The delay doubled, capped at the maximum.
+    now[0] += 99.0
+    await learner.trigger_rebuild()
+    assert repository.attempts == 2
+    now[0] += 1.0
+    await learner.trigger_rebuild()
+    assert repository.attempts == 3
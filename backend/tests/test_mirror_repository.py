@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+import app.mirror as mirror
+from app.mirror import AsyncMirrorLoop, MirrorPolicyLearner, MirrorRepository
+from app.mirror.tables import mirror_events
+from app.mirror.utils import MirrorEpisode
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'mirror.db'}")
+    yield engine
+    engine.dispose()
+
+
+def _episode(reward=0.2, bucket_key="10-L-P"):
+    return MirrorEpisode(
+        ts=datetime.now(timezone.utc),
+        user_count=1,
+        tone="warm",
+        intensity=0.5,
+        intensity_bin=5,
+        reward=reward,
+        pre_coh=0.5,
+        pre_ent=0.5,
+        post_coh=0.5 + reward,
+        post_ent=0.5,
+        pre_pad=(0.1, 0.2, 0.3),
+        post_pad=(0.3, 0.2, 0.1),
+        dt_ms=1000,
+        bucket_key=bucket_key,
+    )
+
+
+def _event_count(engine):
+    with engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(mirror_events)).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_close_mirror_loop_writes_queued_episodes(engine, monkeypatch):
+    repository = MirrorRepository(engine)
+    loop = AsyncMirrorLoop(repository, MirrorPolicyLearner(repository))
+    monkeypatch.setattr(mirror, "_loop", loop)
+
+    await repository.insert_event(_episode())
+    assert _event_count(engine) == 0
+
+    await mirror.close_mirror_loop()
+    assert _event_count(engine) == 1
+
+
+@pytest.mark.asyncio
+async def test_policy_cache_dropped_when_batch_commits(engine):
+    repository = MirrorRepository(engine)
+    loop = AsyncMirrorLoop(repository, MirrorPolicyLearner(repository), epsilon=0.0)
+    state = {"coherence": 0.5, "entropy": 0.5, "pad_avg": [0.1, 0.2, 0.3], "ts": 1000}
+    fallback = {"tone": "warm", "intensity": 0.5, "message": "m"}
+
+    result = await loop.choose_action(state, fallback, user_count=1, mirror_active=True)
+    bucket_key = result["bucket_key"]
+    await loop.observe_state({**state, "coherence": 0.8, "ts": 1001})
+    # Queued but not committed yet: the cached policy is still current.
+    assert bucket_key in loop._policy_cache
+
+    await repository.flush()
+    assert bucket_key not in loop._policy_cache
+    best = await loop._best_policy(bucket_key)
+    assert (best.tone, best.n) == ("warm", 1)
+
+
+@pytest.mark.asyncio
+async def test_failing_listener_does_not_stop_later_flushes(engine):
+    repository = MirrorRepository(engine)
+    seen = []
+
+    def broken(bucket_keys):
+        raise RuntimeError("listener bug")
+
+    repository.add_flush_listener(broken)
+    repository.add_flush_listener(seen.append)
+
+    await repository.insert_event(_episode(bucket_key="a"))
+    await repository.flush()
+    await repository.insert_event(_episode(bucket_key="b"))
+    await repository.flush()
+
+    assert seen == [{"a"}, {"b"}]
+    assert _event_count(engine) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_flush_is_restarted(engine):
+    repository = MirrorRepository(engine)
+
+    await repository.insert_event(_episode())
+    await asyncio.sleep(0)
+    task = repository._flush_task
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert repository._flush_task is None
+
+    await repository.insert_event(_episode())
+    await repository.flush()
+    assert _event_count(engine) == 2
@@ -0,0 +1,114 @@
+import json
+import sqlite3
+
+import pytest
+
+from app.mirror.manager import MirrorManager
+from app.mirror.storage import MirrorRepository, unpack_pad
+from app.mirror.utils import EpisodeRecord, MirrorAction, MirrorState
+
+
+@pytest.fixture
+async def repository(tmp_path):
+    repo = MirrorRepository(f"sqlite:///{tmp_path / 'mirror.db'}")
+    await repo.migrate()
+    yield repo
+    await repo._engine.dispose()
+
+
+def _episode(coherence, *, tone="warm", intensity=0.45, bucket_key="10-L-P", ts=1000):
+    pre = MirrorState(coherence=0.5, entropy=0.5, pad=(0.1, 0.2, 0.3), ts=ts)
+    post = MirrorState(coherence=coherence, entropy=0.5, pad=(0.3, 0.2, 0.1), ts=ts + 2)
+    action = MirrorAction(tone=tone, intensity=intensity)
+    return EpisodeRecord(pre=pre, action=action, bucket_key=bucket_key, user_count=3, started_at=ts), post
+
+
+@pytest.mark.asyncio
+async def test_record_episode_keeps_running_policy_average(repository):
+    for coherence in (0.6, 0.7, 0.9):
+        await repository.record_episode(*_episode(coherence))
+
+    best = await repository.get_best_policy("10-L-P")
+    assert (best.tone, best.intensity_bin, best.n) == ("warm", 4, 3)
+    assert best.reward_avg == pytest.approx((0.1 + 0.2 + 0.4) / 3)
+
+    events = await repository.list_recent_events()
+    assert len(events) == 3
+    assert unpack_pad(events[0].post_pad) == pytest.approx((0.3, 0.2, 0.1))
+    assert events[0].dt_ms == 2000
+
+    stats = await repository.stats()
+    assert stats["total_events"] == 3
+    assert stats["unique_buckets"] == 1
+
+
+@pytest.mark.asyncio
+async def test_recalculate_matches_incremental_policy(repository):
+    for i, coherence in enumerate((0.2, 0.6, 0.9, 0.4)):
+        await repository.record_episode(*_episode(coherence, tone="warm" if i % 2 else "cool"))
+    before = {(p.tone, p.intensity_bin): (pytest.approx(p.reward_avg), p.n) for p in await repository.get_policy_entries()}
+
+    await repository.recalculate_policies()
+
+    after = {(p.tone, p.intensity_bin): (p.reward_avg, p.n) for p in await repository.get_policy_entries()}
+    assert after == before
+
+
+@pytest.mark.asyncio
+async def test_heatmap_json_matches_heatmap(repository):
+    for i, coherence in enumerate((0.2, 0.6, 0.9)):
+        await repository.record_episode(*_episode(coherence, intensity=0.1 * i))
+
+    cells = json.loads(await repository.heatmap_json())
+    expected = await repository.heatmap()
+    key = lambda cell: (cell["tone"], cell["intensity_bin"])
+    assert [key(cell) for cell in sorted(cells, key=key)] == [key(cell) for cell in sorted(expected, key=key)]
+    for cell, want in zip(sorted(cells, key=key), sorted(expected, key=key)):
+        assert cell["count"] == want["count"]
+        assert cell["reward"] == pytest.approx(want["reward"])
+
+
+@pytest.mark.asyncio
+async def test_manager_records_started_episode(repository):
+    manager = MirrorManager(repository)
+    fallback = MirrorAction(tone="neutral", intensity=0.3, message="hi")
+
+    assert await manager.choose_action({}, fallback, user_count=1, mirror_allowed=False) == (fallback, "")
+
+    state = {"coherence": 0.5, "entropy": 0.4, "pad_avg": [0.2, 0.6, 0.1], "ts": 1000}
+    action, bucket_key = await manager.choose_action(state, fallback, user_count=1, mirror_allowed=True)
+    await manager.start_episode(state, action, bucket_key, user_count=1)
+    await manager.observe_post_state({**state, "coherence": 0.8, "ts": 1000})
+
+    (event,) = await repository.list_recent_events()
+    assert event.bucket_key == bucket_key
+    assert event.ts == 1001  # post state is moved after the pre state
+    assert event.reward == pytest.approx(0.3)
+
+
+@pytest.mark.asyncio
+async def test_migrate_repacks_text_pads(tmp_path):
+    path = tmp_path / "old.db"
+    with sqlite3.connect(path) as db:
+        # Layout written by earlier versions, with PAD vectors as text.
+        db.execute(
+            "CREATE TABLE mirror_events (id INTEGER PRIMARY KEY, ts INTEGER NOT NULL,"
+            " user_count INTEGER NOT NULL, tone VARCHAR(16) NOT NULL, intensity FLOAT NOT NULL,"
+            " intensity_bin INTEGER NOT NULL, pre_coh FLOAT NOT NULL, pre_ent FLOAT NOT NULL,"
+            " pre_pad VARCHAR(64) NOT NULL, post_coh FLOAT NOT NULL, post_ent FLOAT NOT NULL,"
+            " post_pad VARCHAR(64) NOT NULL, dt_ms INTEGER NOT NULL, bucket_key VARCHAR(32) NOT NULL,"
+            " reward FLOAT NOT NULL)"
+        )
+        db.execute(
+            "INSERT INTO mirror_events VALUES"
+            " (1, 1000, 1, 'warm', 0.4, 4, 0.5, 0.5, '0.1000,0.2000,0.3000', 0.6, 0.5, '0.5000,0.2500', 2000, 'k', 0.1)"
+        )
+
+    repo = MirrorRepository(f"sqlite:///{path}")
+    await repo.migrate()
+    await repo.record_episode(*_episode(0.7, bucket_key="k"))
+    old, new = sorted(await repo.list_recent_events(), key=lambda event: event.id)
+    assert unpack_pad(old.pre_pad) == pytest.approx((0.1, 0.2, 0.3))
+    assert unpack_pad(old.post_pad) == pytest.approx((0.5, 0.25, 0.0))
+    assert unpack_pad(new.pre_pad) == pytest.approx((0.1, 0.2, 0.3))
+    await repo._engine.dispose()